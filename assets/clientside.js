@@ -0,0 +1,86 @@
+// assets/clientside.js
+//
+// Clientside callbacks: pure-UI toggles and KPI formatting run in the
+// browser instead of a round-trip to the server.
+
+(function () {
+    function formatMoney(x) {
+        // Same output as src/utils/formatting.py:format_money
+        if (Math.abs(x) >= 1e9) {
+            return "$" + (x / 1e9).toFixed(2) + "B";
+        }
+        if (Math.abs(x) >= 1e6) {
+            return "$" + (x / 1e6).toFixed(2) + "M";
+        }
+        return "$" + Math.round(x).toLocaleString("en-US");
+    }
+
+    var FORMATTERS = {
+        money: formatMoney,
+        count: function (x) { return Math.round(x).toLocaleString("en-US", {useGrouping: false}); },
+        percent: function (x) { return x.toFixed(1) + "%"; },
+        minutes: function (x) { return Math.trunc(x) + " min"; },
+        text: function (x) { return String(x); }
+    };
+
+    // Pending debounce timers by target id
+    var pending = {};
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        ui: {
+            // Flip a dbc.Collapse on each button click
+            toggle: function (nClicks, isOpen) {
+                return nClicks ? !isOpen : isOpen;
+            },
+
+            // Resolve with value once no newer value arrived for delay ms;
+            // superseded calls resolve with no_update
+            debounce: function (key, value, delay) {
+                var noUpdate = window.dash_clientside.no_update;
+                if (pending[key]) {
+                    clearTimeout(pending[key].timer);
+                    pending[key].resolve(noUpdate);
+                }
+                if (value === null || value === undefined) {
+                    delete pending[key];
+                    return noUpdate;
+                }
+                return new Promise(function (resolve) {
+                    var entry = {resolve: resolve};
+                    entry.timer = setTimeout(function () {
+                        delete pending[key];
+                        resolve(value);
+                    }, delay);
+                    pending[key] = entry;
+                });
+            },
+
+            // Random id per browser tab, kept in sessionStorage by dcc.Store
+            sessionId: function (_, current) {
+                if (current) {
+                    return window.dash_clientside.no_update;
+                }
+                if (window.crypto && window.crypto.randomUUID) {
+                    return window.crypto.randomUUID();
+                }
+                return Date.now().toString(36) + Math.random().toString(36).slice(2);
+            }
+        },
+        kpi: {
+            // [[value, kind], ...] from the server -> one string per KPI
+            format: function (values) {
+                if (!values) {
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                return values.map(function (item) {
+                    var value = item[0];
+                    var kind = item[1];
+                    if (value === null || value === undefined) {
+                        return "N/A";
+                    }
+                    return FORMATTERS[kind](value);
+                });
+            }
+        }
+    });
+})();
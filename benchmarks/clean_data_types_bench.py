@@ -0,0 +1,129 @@
+# benchmarks/clean_data_types_bench.py
+
+"""Time clean_movie_dtypes against the previous implementation.
+
+Runs both on the dashboard CSV twice: once as stored (money columns
+already numeric) and once with the money columns written as "$1,234"
+strings, as in the raw exports. Checks that both give the same frame.
+
+    python -m benchmarks.clean_data_types_bench --repeat 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.clean_data_types import clean_movie_dtypes
+from src.utils.constants import DATA_PATH
+
+MONEY_COLS = [
+    "Production Budget (USD)",
+    "Domestic Gross (USD)",
+    "Worldwide Gross (USD)",
+    "Domestic Box Office (USD)",
+    "International Box Office (USD)",
+]
+
+# ---------------------------------------------------------
+# Previous implementation, kept for comparison
+# ---------------------------------------------------------
+def legacy_fix_numeric_column(series):
+    return (
+        series.astype(str)
+        .str.replace(",", "", regex=False)
+        .str.replace("$", "", regex=False)
+        .str.replace("%", "", regex=False)
+        .str.strip()
+        .replace({"nan": np.nan, "": np.nan})
+        .astype(float)
+    )
+
+def legacy_clean_movie_dtypes(df):
+    df = df.copy()
+
+    money_cols = [
+        "Production Budget (USD)",
+        "Domestic Gross (USD)",
+        "International Gross (USD)",
+        "Worldwide Gross (USD)",
+        "Domestic Box Office (USD)",
+        "International Box Office (USD)",
+    ]
+    for col in money_cols:
+        if col in df.columns:
+            df[col] = legacy_fix_numeric_column(df[col])
+
+    for col in ["Running Time (minutes)", "Opening Theaters", "Max Theaters"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    if "Domestic Share Percentage" in df.columns:
+        df["Domestic Share Percentage"] = (
+            df["Domestic Share Percentage"]
+            .astype(str)
+            .str.replace("%", "", regex=False)
+            .str.strip()
+        )
+        df["Domestic Share Percentage"] = pd.to_numeric(
+            df["Domestic Share Percentage"], errors="coerce"
+        )
+
+    if "Release Date" in df.columns:
+        df["Release Date"] = pd.to_datetime(df["Release Date"], errors="coerce")
+        df["Year"] = df["Release Date"].dt.year
+        df.loc[df["Year"] > 2025, "Year"] -= 100
+        df["Year"] = df["Year"].astype("float")
+
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        df[col] = (
+            df[col]
+            .astype(str)
+            .str.strip()
+            .str.replace("\xa0", " ", regex=False)
+            .replace({"nan": np.nan})
+        )
+
+    return df, df.dtypes.to_dict()
+
+# ---------------------------------------------------------
+# Harness
+# ---------------------------------------------------------
+def _with_currency_strings(df):
+    df = df.copy()
+    for col in MONEY_COLS:
+        values = df[col]
+        df[col] = ("$" + values.map("{:,.0f}".format, na_action="ignore")).where(values.notna())
+    return df
+
+def _best_of(fn, df, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        out, _ = fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="stack the CSV this many times")
+    parser.add_argument("--rounds", type=int, default=3, help="timed runs per case (best is reported)")
+    parser.add_argument("--object-strings", action="store_true", help="read text as object dtype (the pandas 2 default)")
+    args = parser.parse_args()
+
+    with pd.option_context("future.infer_string", not args.object_strings):
+        base = pd.read_csv(DATA_PATH)
+    base = pd.concat([base] * args.repeat, ignore_index=True)
+
+    for label, df in [("as stored", base), ("currency strings", _with_currency_strings(base))]:
+        old_time, old = _best_of(legacy_clean_movie_dtypes, df, args.rounds)
+        new_time, new = _best_of(clean_movie_dtypes, df, args.rounds)
+        pd.testing.assert_frame_equal(new, old, check_dtype=False)
+        print(
+            f"{label:>16}: {len(df):>8} rows  legacy {old_time * 1e3:8.1f} ms  "
+            f"new {new_time * 1e3:8.1f} ms  ({old_time / new_time:.1f}x)"
+        )
+
+if __name__ == "__main__":
+    main()
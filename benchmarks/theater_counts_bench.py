@@ -0,0 +1,72 @@
+# benchmarks/theater_counts_bench.py
+
+"""Time parse_theater_counts against the previous per-row parser.
+
+Runs both on the "Theater counts" column of the raw export, stacked
+``--repeat`` times, and checks that both give the same counts.
+
+    python -m benchmarks.theater_counts_bench --repeat 100
+"""
+
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.clean_data_types import parse_theater_counts
+from src.utils.constants import DATA_PATH
+
+# ---------------------------------------------------------
+# Previous implementation, kept for comparison
+# ---------------------------------------------------------
+def legacy_extract_theaters(text):
+    if pd.isna(text):
+        return np.nan, np.nan
+    match = re.match(r"([0-9,]+) opening theaters/([0-9,]+) max. theaters", str(text))
+    if match:
+        opening = int(match.group(1).replace(",", ""))
+        maximum = int(match.group(2).replace(",", ""))
+        return opening, maximum
+    return np.nan, np.nan
+
+def legacy_parse_theater_counts(series):
+    opening, maximum = zip(*series.map(legacy_extract_theaters))
+    return pd.DataFrame({
+        "Opening Theaters": pd.Series(opening, index=series.index).astype("float64"),
+        "Max Theaters": pd.Series(maximum, index=series.index).astype("float64"),
+    })
+
+# ---------------------------------------------------------
+# Harness
+# ---------------------------------------------------------
+def _best_of(fn, series, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        out = fn(series)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=30, help="stack the column this many times")
+    parser.add_argument("--rounds", type=int, default=3, help="timed runs per parser (best is reported)")
+    parser.add_argument("--object-strings", action="store_true", help="read text as object dtype (the pandas 2 default)")
+    args = parser.parse_args()
+
+    with pd.option_context("future.infer_string", not args.object_strings):
+        column = pd.read_csv(DATA_PATH, usecols=["Theater counts"])["Theater counts"]
+    series = pd.concat([column] * args.repeat, ignore_index=True)
+
+    old_time, old = _best_of(legacy_parse_theater_counts, series, args.rounds)
+    new_time, new = _best_of(parse_theater_counts, series, args.rounds)
+    pd.testing.assert_frame_equal(new, old)
+    print(
+        f"{len(series):>8} rows  legacy {old_time * 1e3:8.1f} ms ({len(series) / old_time / 1e6:.2f} M rows/s)  "
+        f"new {new_time * 1e3:8.1f} ms ({len(series) / new_time / 1e6:.2f} M rows/s)  ({old_time / new_time:.1f}x)"
+    )
+
+if __name__ == "__main__":
+    main()
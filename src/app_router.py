@@ -7,6 +7,7 @@ from src.pages.home import layout as home_layout, register_callbacks as register
 from src.pages.video_sales import layout as video_layout, register_callbacks as register_video_callbacks
 from src.pages.financial_analysis import layout as fin_layout, register_callbacks as register_fin_callbacks
 from src.pages.insights import layout as insights_layout, register_callbacks as register_insights_callbacks
+from src.utils.clientside import register_session_id
 
 NAV = dbc.Nav(
     [
@@ -23,6 +24,8 @@ def build_app(app):
     app.layout = dbc.Container(
         [
             dcc.Location(id="url", refresh=False),
+            # Per-tab id, lets the server drop superseded requests (see request_gate)
+            dcc.Store(id="session-id", storage_type="session"),
             dbc.Row(
                 [
                     dbc.Col(html.Div("🎬 Top Movies Dashboard", className="h3 my-2"), md=8),
@@ -49,6 +52,8 @@ def build_app(app):
         else:
             return home_layout(app)
 
+    register_session_id(app, "session-id", "url", "pathname")
+
     # Register callbacks for all pages (safe: each module registers when called)
     register_fin_callbacks(app)
     register_home_callbacks(app)
@@ -1,201 +1,215 @@
 # src/callbacks/financial_callbacks.py
 
 import pandas as pd
-import plotly.express as px
-from dash import Input, Output
-from plotly.graph_objects import Figure
-
-from src.utils.data_loader import load_movies
-from src.utils.formatting import format_money
-
-def _empty_figure(message="No data for the selected filters"):
-    fig = Figure()
-    fig.update_layout(
-        title=message,
-        template="plotly_white",
-        xaxis={"visible": False},
-        yaxis={"visible": False},
-        annotations=[{
-            "text": message,
-            "xref": "paper",
-            "yref": "paper",
-            "showarrow": False,
-            "font": {"size": 16}
-        }]
-    )
-    return fig
+from dash import Input, Output, State
+
+from src.utils.cube import movie_cube
+from src.utils.data_loader import load_movies, cached_per_selection
+from src.utils.filters import financial_mask, financial_key
+from src.utils.background import background_callback
+from src.utils.clientside import register_kpi_formatter
+from src.utils.filter_inputs import register_slider_policy, slider_input
+from src.utils.formatting import kpi_value
+from src.utils.parallel import run_all
+from src.utils.request_gate import REQUEST_GATE
+from src.utils.figures import array, axis, coloraxis, empty_figure, figure, patch_figures, scatter_figure
+
+# Columns the Financial Analysis callbacks read
+FINANCIAL_COLUMNS = [
+    "Movie Name", "Genre",
+    "Production Budget (USD)", "Worldwide Gross (USD)",
+    "Profit (USD)", "ROI (%)",
+]
+
+# KPI text elements, filled in the browser from the fin-kpi-values store
+FINANCIAL_KPIS = ['kpi-total-profit', 'kpi-avg-roi', 'kpi-top-profit']
+
+@cached_per_selection
+def _cached_selection(profit_range, budget_range, roi_cat, genres):
+    df = load_movies(FINANCIAL_COLUMNS)
+    return df[financial_mask(df, profit_range, budget_range, roi_cat, genres)]
+
+def financial_selection(profit_range, budget_range, roi_cat, genres):
+    """Filtered frame shared by the KPI and chart callbacks."""
+    return _cached_selection(*financial_key(profit_range, budget_range, roi_cat, genres))
+
+def _cube_cells(df, genres):
+    """The cube selection holding exactly the rows of ``df``, or None.
+
+    The cube only knows the genre filter. When the profit, budget and
+    ROI filters drop no rows (the default view), ``df`` is the cube's
+    genre selection and chart medians can come from its sketches.
+    """
+    cells = movie_cube().select(genres)
+    return cells if len(df) == cells.count() else None
+
+def median_roi_by_genre(df, genres):
+    """Median ROI per genre of a Financial selection (approximate when from the cube)."""
+    cells = _cube_cells(df, genres)
+    if cells is not None:
+        return cells.median('ROI (%)', by='Genre')
+    return df.groupby('Genre', observed=True)['ROI (%)'].median()
+
+# ---------------------------------------------------------
+# Chart builders
+# ---------------------------------------------------------
+def _scatter_figure(df):
+    # Profit vs Budget scatter
+    if ('Production Budget (USD)' in df.columns and 'Profit (USD)' in df.columns and 
+        not df.empty and df['Production Budget (USD)'].notna().any() and df['Profit (USD)'].notna().any()):
+        
+        scatter_df = df.dropna(subset=['Production Budget (USD)', 'Profit (USD)'])
+        if not scatter_df.empty:
+            return scatter_figure(
+                scatter_df,
+                x='Production Budget (USD)', 
+                y='Profit (USD)',
+                hover_name='Movie Name', 
+                log_x=True, 
+                trendline="lowess",
+                title='Budget vs Profit (log scale)',
+                x_title="Production Budget (USD)",
+                y_title="Profit (USD)",
+                template="plotly_white",
+            )
+    return empty_figure("Not enough data for Budget vs Profit")
+
+def _roi_genre_figure(df, genres):
+    # ROI by Genre
+    if ('ROI (%)' in df.columns and 'Genre' in df.columns and 
+        not df.empty and df['ROI (%)'].notna().any()):
+        
+        roi_gen = median_roi_by_genre(df, genres).sort_values(ascending=False).reset_index()
+        if not roi_gen.empty:
+            return figure(
+                [{
+                    "type": "bar",
+                    "x": array(roi_gen['Genre']),
+                    "y": array(roi_gen['ROI (%)']),
+                    "marker": {"color": array(roi_gen['ROI (%)']), "coloraxis": "coloraxis"},
+                    "name": "",
+                    "hovertemplate": "Genre=%{x}<br>ROI (%)=%{y}<extra></extra>",
+                }],
+                title='Median ROI by Genre',
+                template="plotly_white",
+                xaxis=axis('Genre'),
+                yaxis=axis('ROI (%)'),
+                coloraxis=coloraxis('viridis', title='ROI (%)'),
+            )
+    return empty_figure("No ROI data by Genre")
+
+def _roi_distribution_figure(df):
+    # ROI distribution
+    if 'ROI (%)' in df.columns and not df.empty and df['ROI (%)'].notna().any():
+        roi_df = df[df['ROI (%)'].notna()]
+        return figure(
+            [{
+                "type": "histogram",
+                "x": array(roi_df['ROI (%)']),
+                "nbinsx": 50,
+                "marker": {"color": '#1f77b4'},
+                "name": "",
+                "hovertemplate": "ROI (%)=%{x}<br>count=%{y}<extra></extra>",
+            }],
+            title='ROI Distribution',
+            template="plotly_white",
+            xaxis=axis('ROI (%)'),
+            yaxis=axis('count'),
+        )
+    return empty_figure("ROI distribution not available")
+
+def _correlation_figure(df):
+    # Correlation heatmap
+    numcols = ['Production Budget (USD)', 'Worldwide Gross (USD)', 'Profit (USD)', 'ROI (%)']
+    present_cols = [c for c in numcols if c in df.columns]
+    
+    if len(present_cols) > 1:
+        # Filter only numeric columns with data
+        corr_df = df[present_cols].apply(pd.to_numeric, errors='coerce').dropna()
+        if not corr_df.empty and len(corr_df) > 1:
+            corr = corr_df.corr()
+            return figure(
+                [{
+                    "type": "heatmap",
+                    "z": corr.to_numpy().tolist(),
+                    "x": list(corr.columns),
+                    "y": list(corr.index),
+                    "coloraxis": "coloraxis",
+                    "texttemplate": "%{z}",
+                    "hovertemplate": "x: %{x}<br>y: %{y}<br>color: %{z}<extra></extra>",
+                }],
+                title='Financial Metrics Correlation',
+                template="plotly_white",
+                yaxis=axis(autorange="reversed"),
+                coloraxis=coloraxis('RdBu_r'),
+            )
+    return empty_figure("Not enough data for correlation")
 
 def register_callbacks(app):
     @app.callback(
-        Output('kpi-total-profit', 'children'),
-        Output('kpi-avg-roi', 'children'),
-        Output('kpi-top-profit', 'children'),
-        Input('filter-profit', 'value'),
-        Input('filter-budget', 'value'),
+        Output('fin-kpi-values', 'data'),
+        slider_input('filter-profit'),
+        slider_input('filter-budget'),
         Input('filter-roi-cat', 'value'),
         Input('filter-genre-fin', 'value'),
     )
     def update_financial_kpis(profit_range, budget_range, roi_cat, genres):
-        df = load_movies()
-        
-        # Check if dataframe is empty
-        if df.empty:
-            return "N/A", "N/A", "N/A"
-
-        # Apply filters
-        if genres:
-            df = df[df['Genre'].isin(genres)]
-            
-        if 'Profit (USD)' in df.columns:
-            df = df[df['Profit (USD)'].notna()]
-            if profit_range and len(profit_range) == 2:
-                df = df[(df['Profit (USD)'] >= profit_range[0]) & (df['Profit (USD)'] <= profit_range[1])]
-                
-        if 'Production Budget (USD)' in df.columns:
-            df = df[df['Production Budget (USD)'].notna()]
-            if budget_range and len(budget_range) == 2:
-                df = df[(df['Production Budget (USD)'] >= budget_range[0]) & (df['Production Budget (USD)'] <= budget_range[1])]
-                
-        if 'ROI (%)' in df.columns and roi_cat and roi_cat != 'all':
-            df = df[df['ROI (%)'].notna()]
-            if roi_cat == 'high':
-                df = df[df['ROI (%)'] > 100]  # Fixed: was 10000
-            elif roi_cat == 'moderate':
-                df = df[(df['ROI (%)'] >= 0) & (df['ROI (%)'] <= 100)]  # Fixed: was 10000
-            elif roi_cat == 'low':
-                df = df[df['ROI (%)'] < 0]
+        df = financial_selection(profit_range, budget_range, roi_cat, genres)
 
         if df.empty:
-            return "N/A", "N/A", "N/A"
+            return [kpi_value(None), kpi_value(None, "percent"), kpi_value(None, "text")]
 
         # Calculate KPIs with safety checks
         total_profit = df['Profit (USD)'].sum() if 'Profit (USD)' in df.columns and df['Profit (USD)'].notna().any() else 0
         avg_roi = df['ROI (%)'].median() if 'ROI (%)' in df.columns and df['ROI (%)'].notna().any() else None
         
-        top_movie = "N/A"
+        top_movie = None
         if 'Profit (USD)' in df.columns and 'Movie Name' in df.columns and not df.empty:
             profit_df = df[df['Profit (USD)'].notna()]
             if not profit_df.empty:
                 top_movie = profit_df.loc[profit_df['Profit (USD)'].idxmax(), 'Movie Name']
 
-        return format_money(total_profit), f"{avg_roi:.1f}%" if avg_roi is not None else "N/A", top_movie
+        return [kpi_value(total_profit), kpi_value(avg_roi, "percent"), kpi_value(top_movie, "text")]
 
-    @app.callback(
+    register_kpi_formatter(app, 'fin-kpi-values', FINANCIAL_KPIS)
+    register_slider_policy(app, 'filter-profit', 'filter-budget')
+
+    # Scatter + LOWESS and the correlation heatmap are the slow charts:
+    # a background job when BACKGROUND_CALLBACKS=1, inline otherwise
+    @background_callback(
+        app,
         Output('chart-profit-vs-budget', 'figure'),
         Output('chart-roi-genre', 'figure'),
         Output('chart-roi-distribution', 'figure'),
         Output('chart-fin-corr', 'figure'),
-        Input('filter-profit', 'value'),
-        Input('filter-budget', 'value'),
+        Output('fin-figure-signatures', 'data'),
+        slider_input('filter-profit'),
+        slider_input('filter-budget'),
         Input('filter-roi-cat', 'value'),
         Input('filter-genre-fin', 'value'),
+        State('fin-figure-signatures', 'data'),
+        State('session-id', 'data'),
+        progress=Output('fin-charts-progress', 'value'),
+        running=[(Output('fin-charts-progress', 'style'), {"visibility": "visible"}, {"visibility": "hidden"})],
+        cancel=[Input('url', 'pathname')],
     )
-    def update_financial_charts(profit_range, budget_range, roi_cat, genres):
-        df = load_movies()
-
-        # Apply same filters as KPIs
-        if df.empty:
-            return _empty_figure("No data available"), _empty_figure("No data available"), _empty_figure("No data available"), _empty_figure("No data available")
-
-        if genres:
-            df = df[df['Genre'].isin(genres)]
-            
-        if 'Profit (USD)' in df.columns:
-            df = df[df['Profit (USD)'].notna()]
-            if profit_range and len(profit_range) == 2:
-                df = df[(df['Profit (USD)'] >= profit_range[0]) & (df['Profit (USD)'] <= profit_range[1])]
-                
-        if 'Production Budget (USD)' in df.columns:
-            df = df[df['Production Budget (USD)'].notna()]
-            if budget_range and len(budget_range) == 2:
-                df = df[(df['Production Budget (USD)'] >= budget_range[0]) & (df['Production Budget (USD)'] <= budget_range[1])]
-                
-        if 'ROI (%)' in df.columns and roi_cat and roi_cat != 'all':
-            df = df[df['ROI (%)'].notna()]
-            if roi_cat == 'high':
-                df = df[df['ROI (%)'] > 100]  # Fixed: was 10000
-            elif roi_cat == 'moderate':
-                df = df[(df['ROI (%)'] >= 0) & (df['ROI (%)'] <= 100)]  # Fixed: was 10000
-            elif roi_cat == 'low':
-                df = df[df['ROI (%)'] < 0]
-
-        # Profit vs Budget scatter
-        if ('Production Budget (USD)' in df.columns and 'Profit (USD)' in df.columns and 
-            not df.empty and df['Production Budget (USD)'].notna().any() and df['Profit (USD)'].notna().any()):
-            
-            scatter_df = df.dropna(subset=['Production Budget (USD)', 'Profit (USD)'])
-            if not scatter_df.empty:
-                fig_scatter = px.scatter(
-                    scatter_df,
-                    x='Production Budget (USD)', 
-                    y='Profit (USD)',
-                    hover_name='Movie Name', 
-                    log_x=True, 
-                    trendline="lowess",
-                    title='Budget vs Profit (log scale)',
-                )
-                fig_scatter.update_xaxes(tickformat="~s", tickprefix="$", title="Production Budget (USD)")
-                fig_scatter.update_yaxes(tickformat="~s", tickprefix="$", title="Profit (USD)")
-                fig_scatter.update_layout(template="plotly_white")
-            else:
-                fig_scatter = _empty_figure("Not enough data for Budget vs Profit")
-        else:
-            fig_scatter = _empty_figure("Not enough data for Budget vs Profit")
-
-        # ROI by Genre
-        if ('ROI (%)' in df.columns and 'Genre' in df.columns and 
-            not df.empty and df['ROI (%)'].notna().any()):
-            
-            roi_gen = df.groupby('Genre', as_index=False)['ROI (%)'].median().sort_values('ROI (%)', ascending=False)
-            if not roi_gen.empty:
-                fig_roi_gen = px.bar(
-                    roi_gen, 
-                    x='Genre', 
-                    y='ROI (%)', 
-                    title='Median ROI by Genre',
-                    color='ROI (%)',
-                    color_continuous_scale='viridis'
-                )
-                fig_roi_gen.update_layout(template="plotly_white")
-            else:
-                fig_roi_gen = _empty_figure("No ROI data by Genre")
-        else:
-            fig_roi_gen = _empty_figure("No ROI data by Genre")
-
-        # ROI distribution
-        if 'ROI (%)' in df.columns and not df.empty and df['ROI (%)'].notna().any():
-            roi_df = df[df['ROI (%)'].notna()]
-            fig_roi_dist = px.histogram(
-                roi_df, 
-                x='ROI (%)', 
-                nbins=50, 
-                title='ROI Distribution',
-                color_discrete_sequence=['#1f77b4']
-            )
-            fig_roi_dist.update_layout(template="plotly_white")
-        else:
-            fig_roi_dist = _empty_figure("ROI distribution not available")
-
-        # Correlation heatmap
-        numcols = ['Production Budget (USD)', 'Worldwide Gross (USD)', 'Profit (USD)', 'ROI (%)']
-        present_cols = [c for c in numcols if c in df.columns]
-        
-        if len(present_cols) > 1:
-            # Filter only numeric columns with data
-            corr_df = df[present_cols].apply(pd.to_numeric, errors='coerce').dropna()
-            if not corr_df.empty and len(corr_df) > 1:
-                corr = corr_df.corr()
-                fig_corr = px.imshow(
-                    corr, 
-                    text_auto=True, 
-                    title='Financial Metrics Correlation',
-                    color_continuous_scale='RdBu_r',
-                    aspect="auto"
-                )
-                fig_corr.update_layout(template="plotly_white")
-            else:
-                fig_corr = _empty_figure("Not enough data for correlation")
-        else:
-            fig_corr = _empty_figure("Not enough data for correlation")
-
-        return fig_scatter, fig_roi_gen, fig_roi_dist, fig_corr
\ No newline at end of file
+    def update_financial_charts(set_progress, profit_range, budget_range, roi_cat, genres, signatures, session_id):
+        set_progress(0)
+        ticket = REQUEST_GATE.begin(session_id, "financial-charts")
+        df = financial_selection(profit_range, budget_range, roi_cat, genres)
+        REQUEST_GATE.check(ticket)
+        set_progress(10)
+
+        figs = run_all(
+            lambda: _scatter_figure(df),
+            lambda: _roi_genre_figure(df, genres),
+            lambda: _roi_distribution_figure(df),
+            lambda: _correlation_figure(df),
+        )
+
+        # The scatter (thinning + LOWESS) is the slow part; stop here if superseded
+        REQUEST_GATE.check(ticket)
+        set_progress(90)
+
+        updates, signatures = patch_figures(figs, signatures)
+        return (*updates, signatures)
@@ -1,173 +1,236 @@
 # src/callbacks/home_callbacks.py
 
-import pandas as pd
-import plotly.express as px
-from dash import Input, Output, dash_table
+from functools import cached_property
+
+from dash import Input, Output, State
+
+from src.utils.filters import apply_filters, filter_key
+from src.utils.cube import movie_cube
+from src.utils.data_loader import load_movies, cached_per_dataset, cached_per_selection
+from src.utils.clientside import register_kpi_formatter
+from src.utils.filter_inputs import register_slider_policy, slider_input
+from src.utils.formatting import kpi_value
+from src.utils.parallel import run_all
+from src.utils.request_gate import REQUEST_GATE
+from src.utils.table_query import SortIndex, page_records
+from src.utils.figures import array, axis, coloraxis, figure, patch_figures
+from src.utils.theme import BLUE, BLUE_LIGHT
+
+# Columns the Home callbacks read; everything else stays unloaded
+HOME_COLUMNS = [
+    "Movie Name", "Year", "Genre",
+    "Production Budget (USD)", "Worldwide Gross (USD)",
+    "Running Time (minutes)",
+]
+
+# Columns shown (and sortable) in the Home movie table
+TABLE_COLUMNS = [
+    "Movie Name", "Year", "Genre",
+    "Production Budget (USD)", "Worldwide Gross (USD)",
+    "Running Time (minutes)",
+]
+
+# KPI text elements, filled in the browser from the home-kpi-values store
+HOME_KPIS = ['kpi-total-movies', 'kpi-total-gross', 'kpi-avg-budget', 'kpi-avg-runtime']
+
+class HomeSelection:
+    """Filtered Home frame plus the aggregates its callbacks share.
+
+    The rollups come from the same selection of the movie cube, not
+    from grouping the frame.
+    """
+
+    def __init__(self, df, cells):
+        self.df = df
+        self.cells = cells
+
+    @cached_property
+    def gross_by_year(self):
+        return self.cells.sum("Worldwide Gross (USD)", by="Year").reset_index()
+
+    @cached_property
+    def gross_box_by_genre(self):
+        return self.cells.box_stats("Worldwide Gross (USD)", by="Genre").sort_values("median")
+
+    @cached_property
+    def gross_by_company(self):
+        return self.cells.company_sum("Worldwide Gross (USD)", exclude_placeholders=True)
+
+@cached_per_selection
+def _cached_selection(genres, year_range):
+    return HomeSelection(
+        apply_filters(load_movies(HOME_COLUMNS), genres, year_range),
+        movie_cube().select(genres, year_range, require_year=True),
+    )
+
+def home_selection(selected_genres, year_range):
+    """The HomeSelection for a filter state (see cached_per_selection)."""
+    return _cached_selection(*filter_key(selected_genres, year_range))
+
+@cached_per_dataset
+def table_sort_index():
+    return SortIndex(load_movies(TABLE_COLUMNS), TABLE_COLUMNS)
+
+# ---------------------------------------------------------
+# Chart builders
+# ---------------------------------------------------------
+def _trend_figure(selection):
+    # Sales trend (line chart)
+    trend = selection.gross_by_year
+    return figure(
+        [{
+            "type": "scatter",
+            "mode": "lines+markers",
+            "x": array(trend["Year"]),
+            "y": array(trend["Worldwide Gross (USD)"]),
+            "line": {"color": BLUE, "width": 3},
+            "name": "",
+            "hovertemplate": "Year=%{x}<br>Worldwide Gross (USD)=%{y}<extra></extra>",
+        }],
+        title="Worldwide Gross by Year",
+        xaxis=axis("Year"),
+        yaxis=axis("Worldwide Gross (USD)", money=True),
+    )
+
+def _top_movies_figure(selection):
+    # Top 10 movies (horizontal bar)
+    top = selection.df.nlargest(10, "Worldwide Gross (USD)")
+    return figure(
+        [{
+            "type": "bar",
+            "orientation": "h",
+            "x": array(top["Worldwide Gross (USD)"]),
+            "y": array(top["Movie Name"]),
+            "marker": {"color": BLUE},
+            "name": "",
+            "hovertemplate": "Worldwide Gross (USD)=%{x}<br>Movie Name=%{y}<extra></extra>",
+        }],
+        title="Top 10 Movies by Worldwide Gross",
+        xaxis=axis("Worldwide Gross (USD)", money=True),
+        yaxis=axis("Movie Name"),
+    )
+
+def _genre_box_figure(selection):
+    # Genre distribution box plot, genres sorted by median revenue.
+    # Drawn from the sketch quartiles and fences, so the payload is one
+    # box per genre; individual outlier points are not sent.
+    stats = selection.gross_box_by_genre
+
+    return figure(
+        [{
+            "type": "box",
+            "x": array(stats.index),
+            "q1": array(stats["q1"]),
+            "median": array(stats["median"]),
+            "q3": array(stats["q3"]),
+            "lowerfence": array(stats["lowerfence"]),
+            "upperfence": array(stats["upperfence"]),
+            "marker": {"color": BLUE_LIGHT},
+            "name": "",
+            "hovertemplate": "Genre=%{x}<br>Worldwide Gross (USD)=%{y}<extra></extra>",
+        }],
+        title="Revenue Distribution by Genre",
+        xaxis=axis("Genre"),
+        yaxis=axis("Worldwide Gross (USD)", money=True),
+    )
 
-from src.utils.filters import apply_filters
-from src.utils.data_loader import load_movies
-from src.utils.formatting import format_money
-from src.utils.theme import COMMON_LAYOUT, BLUE, BLUE_LIGHT
+def _treemap_figure(selection):
+    # Studio treemap
+    top_comp = selection.gross_by_company.nlargest(40).reset_index()
+
+    if top_comp.empty:
+        return figure(
+            [{"type": "treemap", "labels": [], "parents": [], "values": []}],
+            title="Top Production Companies by Worldwide Gross (no valid data)",
+        )
+
+    companies = array(top_comp["Company"])
+    return figure(
+        [{
+            "type": "treemap",
+            "ids": companies,
+            "labels": companies,
+            "parents": [""] * len(top_comp),
+            "values": array(top_comp["Worldwide Gross (USD)"]),
+            "branchvalues": "total",
+            "marker": {"colors": array(top_comp["Worldwide Gross (USD)"]), "coloraxis": "coloraxis"},
+            "name": "",
+            "hovertemplate": "<b>%{label}</b><br>Gross: $%{value:,.0f}",
+            "texttemplate": "%{label}",
+        }],
+        title="Top Production Companies by Worldwide Gross",
+        coloraxis=coloraxis("Blues", title="Worldwide Gross (USD)"),
+    )
 
 def register_callbacks(app):
     @app.callback(
-        Output('kpi-total-movies', 'children'),
-        Output('kpi-total-gross', 'children'),
-        Output('kpi-avg-budget', 'children'),
-        Output('kpi-avg-runtime', 'children'),
+        Output('home-kpi-values', 'data'),
         Input('filter-genre', 'value'),
-        Input('filter-year', 'value'),
+        slider_input('filter-year'),
     )
     def update_kpis(selected_genres, year_range):
-        df = apply_filters(load_movies(), selected_genres, year_range)
+        df = home_selection(selected_genres, year_range).df
         
         total = len(df)
         total_gross = df['Worldwide Gross (USD)'].sum()
         avg_budget = df['Production Budget (USD)'].mean()
         avg_runtime = df['Running Time (minutes)'].mean()
 
-        return (
-            f"{total}",
-            format_money(total_gross),
-            format_money(avg_budget),
-            f"{int(avg_runtime)} min" if not pd.isna(avg_runtime) else "N/A"
-        )
+        return [
+            kpi_value(total, "count"),
+            kpi_value(total_gross),
+            kpi_value(avg_budget),
+            kpi_value(avg_runtime, "minutes"),
+        ]
+
+    register_kpi_formatter(app, 'home-kpi-values', HOME_KPIS)
+    register_slider_policy(app, 'filter-year')
 
     @app.callback(
         Output('chart-sales-trend', 'figure'),
         Output('chart-top-movies', 'figure'),
         Output('chart-genre-box', 'figure'),
         Output('chart-studios-treemap', 'figure'),
+        Output('home-figure-signatures', 'data'),
         Input('filter-genre', 'value'),
-        Input('filter-year', 'value'),
+        slider_input('filter-year'),
+        State('home-figure-signatures', 'data'),
+        State('session-id', 'data'),
     )
-    def update_charts(selected_genres, year_range):
-        df = apply_filters(load_movies(), selected_genres, year_range)
-
-        # -------------------------------
-        # SALES TREND (LINE CHART)
-        # -------------------------------
-        trend = (
-            df.groupby("Year", as_index=False)["Worldwide Gross (USD)"]
-            .sum()
-            .sort_values("Year")
-        )
-        fig_trend = px.line(
-           trend,
-            x="Year",
-            y="Worldwide Gross (USD)",
-            title="Worldwide Gross by Year",
-            markers=True,
-            color_discrete_sequence=[BLUE],
+    def update_charts(selected_genres, year_range, signatures, session_id):
+        ticket = REQUEST_GATE.begin(session_id, "home-charts")
+        selection = home_selection(selected_genres, year_range)
+        REQUEST_GATE.check(ticket)
+
+        figs = run_all(
+            lambda: _trend_figure(selection),
+            lambda: _top_movies_figure(selection),
+            lambda: _genre_box_figure(selection),
+            lambda: _treemap_figure(selection),
         )
-        
-        fig_trend.update_traces(line_width=3)
-        fig_trend.update_yaxes(
-            tickformat="~s",
-            tickprefix="$",
-        )
-        fig_trend.update_layout(**COMMON_LAYOUT)
-
-        # -------------------------------
-        # TOP 10 MOVIES (HORIZONTAL BAR)
-        # -------------------------------
-        top = df.nlargest(10, "Worldwide Gross (USD)")
-        fig_top = px.bar(
-            top,
-            x="Worldwide Gross (USD)",
-            y="Movie Name",
-            title="Top 10 Movies by Worldwide Gross",
-            orientation="h",
-            color_discrete_sequence=[BLUE],
-        )
-        fig_top.update_xaxes(tickformat="~s", tickprefix="$")
-        fig_top.update_layout(**COMMON_LAYOUT)
-
-        # -------------------------------
-        # GENRE DISTRIBUTION BOX PLOT
-        # -------------------------------
-        # Sort genres by median revenue
-        medians = df.groupby("Genre")["Worldwide Gross (USD)"].median().sort_values()
-        df_sorted = df.set_index("Genre").loc[medians.index].reset_index()
-
-        fig_box = px.box(
-            df_sorted,
-            x="Genre",
-            y="Worldwide Gross (USD)",
-            title="Revenue Distribution by Genre",
-            color_discrete_sequence=[BLUE_LIGHT],
-        )
-        fig_box.update_yaxes(tickformat="~s", tickprefix="$")
-        fig_box.update_layout(**COMMON_LAYOUT)
-        
-        # -------------------------------
-        # STUDIO TREEMAP
-        # -------------------------------
-        df_comp = df.copy()
-        # df_comp["Company"] = df_comp["Production/Financing Companies"].fillna("Unknown")
-        df_comp = df_comp[df_comp["Production/Financing Companies"].notna()]
-        
-        def clean_companies(x):
-            if not isinstance(x, str):
-                return []
-            comps = [c.strip() for c in x.split(",")]
-            return [c for c in comps if c and c.lower() not in ["unknown", "n/a", "na"]]
-        
-        df_comp["Company"] = df_comp["Production/Financing Companies"].apply(clean_companies)
-        
-        df_comp = df_comp.explode("Company")
-        
-        df_comp = df_comp[df_comp["Company"].notna() & (df_comp["Company"] != "")]
-        
-        if df_comp.empty:
-            fig_tree = px.treemap(
-                title="Top Production Companies by Worldwide Gross (no valid data)"
-            )
-        else:
-
-            top_comp = (
-                df_comp.groupby("Company", as_index=False)["Worldwide Gross (USD)"]
-                .sum()
-                .nlargest(40, "Worldwide Gross (USD)")
-            )
-
-            fig_tree = px.treemap(
-                top_comp,
-                path=["Company"],
-                values="Worldwide Gross (USD)",
-                title="Top Production Companies by Worldwide Gross",
-                color="Worldwide Gross (USD)",
-                color_continuous_scale=px.colors.sequential.Blues,
-            )
-
-            fig_tree.update_traces(
-                hovertemplate="<b>%{label}</b><br>Gross: $%{value:,.0f}",
-                texttemplate="%{label}",
-            )
-            
-        fig_tree.update_layout(**COMMON_LAYOUT)
-
-        return fig_trend, fig_top, fig_box, fig_tree
+
+        REQUEST_GATE.check(ticket)
+
+        updates, signatures = patch_figures(figs, signatures)
+        return (*updates, signatures)
 
     @app.callback(
-        Output('table-container', 'children'),
+        Output('movies-table', 'data'),
+        Output('movies-table', 'page_count'),
         Input('filter-genre', 'value'),
-        Input('filter-year', 'value'),
+        slider_input('filter-year'),
+        Input('movies-table', 'page_current'),
+        Input('movies-table', 'page_size'),
+        Input('movies-table', 'sort_by'),
+        Input('movies-table', 'filter_query'),
     )
-    def update_table(selected_genres, year_range):
-        df = apply_filters(load_movies(), selected_genres, year_range)
-
-        cols = [
-            "Movie Name", "Year", "Genre",
-            "Production Budget (USD)", "Worldwide Gross (USD)",
-            "Running Time (minutes)"
-        ]
-        available = [c for c in cols if c in df.columns]
-
-        return dash_table.DataTable(
-            columns=[{"name": c, "id": c} for c in available],
-            data=df[available].to_dict("records"),
-            page_size=10,
-            sort_action="native",
-            filter_action="native",
-        )
\ No newline at end of file
+    def update_table(selected_genres, year_range, page_current, page_size, sort_by, filter_query):
+        df = home_selection(selected_genres, year_range).df
+        available = [c for c in TABLE_COLUMNS if c in df.columns]
+
+        # Only the visible page is serialized; sorting and the column
+        # filters run here instead of in the browser
+        return page_records(
+            df, table_sort_index(), page_current, page_size,
+            sort_by=sort_by, filter_query=filter_query, columns=available,
+        )
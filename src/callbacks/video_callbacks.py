@@ -1,47 +1,49 @@
 # src/callbacks/video_callbacks.py
 
 import pandas as pd
-import plotly.express as px
-from dash import Input, Output
-from plotly.graph_objects import Figure
-
-from src.utils.data_loader import load_movies
-from src.utils.formatting import format_money
-
-def _empty_figure(message="No data for the selected filters"):
-    fig = Figure()
-    fig.update_layout(
-        title=message, 
-        template="plotly_white",
-        xaxis={"visible": False},
-        yaxis={"visible": False},
-        annotations=[{
-            "text": message,
-            "xref": "paper",
-            "yref": "paper",
-            "showarrow": False,
-            "font": {"size": 16}
-        }]
-    )
-    return fig
+from dash import Input, Output, State
+
+from src.utils.data_loader import load_movies, load_company_index
+from src.utils.figures import coloraxis, empty_figure, figure, scatter_figure
+from src.utils.clientside import register_kpi_formatter
+from src.utils.filter_inputs import register_slider_policy, slider_input
+from src.utils.formatting import kpi_value
+from src.utils.request_gate import REQUEST_GATE
+
+# Columns the Video Sales callbacks read
+VIDEO_COLUMNS = [
+    "Movie Name", "Year", "Worldwide Gross (USD)",
+    "Est. Domestic DVD Sales (USD)", "Est. Domestic Blu-ray Sales (USD)",
+]
+
+# KPI text elements, filled in the browser from the video-kpi-values store
+VIDEO_KPIS = ['kpi-total-video-sales', 'kpi-dvd-share']
+
+_NO_KPIS = [kpi_value(None), kpi_value(None, "percent")]
 
 def register_callbacks(app):
     @app.callback(
-        Output('kpi-total-video-sales', 'children'),
-        Output('kpi-dvd-share', 'children'),
+        Output('video-kpi-values', 'data'),
         Output('chart-video-pie', 'figure'),
         Output('chart-gross-vs-video', 'figure'),
         Input('filter-video-only', 'value'),
         Input('filter-video-format', 'value'),
-        Input('filter-year-video', 'value'),
+        slider_input('filter-year-video'),
         Input('filter-studio', 'value'),
+        State('session-id', 'data'),
     )
-    def update_video_sales(video_only, video_format, year_range, studio):
-        df = load_movies().copy()
+    def update_video_sales(video_only, video_format, year_range, studio, session_id):
+        ticket = REQUEST_GATE.begin(session_id, "video-sales")
+        df = load_movies(VIDEO_COLUMNS)
         
         # Check if dataframe is empty
         if df.empty:
-            return "N/A", "N/A", _empty_figure("No video sales data available"), _empty_figure("No data available")
+            return _NO_KPIS, empty_figure("No video sales data available"), empty_figure("No data available")
+
+        # Filter by studio (index lookup, applied first so later steps see fewer rows)
+        if studio:
+            df = df.iloc[load_company_index().positions(studio)]
+        df = df.copy()
 
         # Create total video sales columns with proper handling
         dvd_col = 'Est. Domestic DVD Sales (USD)'
@@ -77,16 +79,8 @@ def register_callbacks(app):
             df = df[df['Year'].notna()]
             df = df[(df['Year'] >= year_range[0]) & (df['Year'] <= year_range[1])]
 
-        # Filter by studio
-        if studio:
-            if 'Production/Financing Companies' in df.columns:
-                df = df[df['Production/Financing Companies'].notna()]
-                df = df[df['Production/Financing Companies'].str.contains(studio, na=False)]
-            else:
-                df = df.iloc[0:0]  # No studio column -> empty
-
         if df.empty:
-            return "N/A", "N/A", _empty_figure("No video sales data for selection"), _empty_figure("No data for selection")
+            return _NO_KPIS, empty_figure("No video sales data for selection"), empty_figure("No data for selection")
 
         # Calculate totals
         total_dvd = df['DVD'].sum()
@@ -95,16 +89,24 @@ def register_callbacks(app):
 
         # Create pie chart
         if total > 0:
-            fig_pie = px.pie(
-                names=['DVD', 'Blu-ray'],
-                values=[total_dvd, total_blu],
+            fig_pie = figure(
+                [{
+                    "type": "pie",
+                    "labels": ['DVD', 'Blu-ray'],
+                    "values": [float(total_dvd), float(total_blu)],
+                    "marker": {"colors": ['#1f77b4', '#ff7f0e']},
+                    "textposition": 'inside',
+                    "textinfo": 'percent+label',
+                    "name": "",
+                    "hovertemplate": "label=%{label}<br>value=%{value}<extra></extra>",
+                }],
                 title='DVD vs Blu-ray Sales',
-                color=['DVD', 'Blu-ray'],
-                color_discrete_map={'DVD': '#1f77b4', 'Blu-ray': '#ff7f0e'}
+                template="plotly",
             )
-            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
         else:
-            fig_pie = _empty_figure("No video sales data")
+            fig_pie = empty_figure("No video sales data")
+
+        REQUEST_GATE.check(ticket)
 
         # Create scatter plot
         scatter_df = df[df['Total Video Sales'] > 0]
@@ -115,7 +117,7 @@ def register_callbacks(app):
             scatter_df = scatter_df[scatter_df['Worldwide Gross (USD)'].notna()]
             
             if not scatter_df.empty:
-                fig_sc = px.scatter(
+                fig_sc = scatter_figure(
                     scatter_df,
                     x='Worldwide Gross (USD)',
                     y='Total Video Sales',
@@ -124,17 +126,20 @@ def register_callbacks(app):
                     log_x=True,
                     size='Total Video Sales',
                     color='Total Video Sales',
-                    color_continuous_scale='viridis'
+                    x_title="Worldwide Gross (USD)",
+                    y_title="Total Video Sales (USD)",
+                    template="plotly",
+                    coloraxis=coloraxis('viridis', showscale=False),
                 )
-                fig_sc.update_xaxes(tickformat="~s", tickprefix="$", title="Worldwide Gross (USD)")
-                fig_sc.update_yaxes(tickformat="~s", tickprefix="$", title="Total Video Sales (USD)")
-                fig_sc.update_layout(coloraxis_showscale=False)
             else:
-                fig_sc = _empty_figure("No valid gross vs video data")
+                fig_sc = empty_figure("No valid gross vs video data")
         else:
-            fig_sc = _empty_figure("No gross vs video data available")
+            fig_sc = empty_figure("No gross vs video data available")
 
         # Calculate DVD share percentage
         dvd_share_pct = (total_dvd / total * 100) if total > 0 else 0
 
-        return format_money(total), f"{dvd_share_pct:.1f}%", fig_pie, fig_sc
\ No newline at end of file
+        return [kpi_value(total), kpi_value(dvd_share_pct, "percent")], fig_pie, fig_sc
+
+    register_kpi_formatter(app, 'video-kpi-values', VIDEO_KPIS)
+    register_slider_policy(app, 'filter-year-video')
@@ -22,7 +22,7 @@ def kpi_card(title, id_value):
 # ---------------------------------------------------------
 def build_layout(app):
     # Load cleaned & corrected dataset
-    df = load_movies()
+    df = load_movies(['Genre', 'Year'])
 
     # -----------------------------
     # Extract Year & Genre filters
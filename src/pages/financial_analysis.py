@@ -1,36 +1,24 @@
 # src/pages/financial_analysis.py
 
 import dash_bootstrap_components as dbc
-from dash import dcc, html, Input, Output
+from dash import dcc, html
 
-from src.utils.data_loader import load_movies
+from src.utils.data_loader import cached_per_dataset
 from src.callbacks.financial_callbacks import register_callbacks as register_financial_callbacks
+from src.utils.clientside import register_collapse_toggle
+from src.utils.filter_inputs import range_slider
+from src.utils.metadata import dataset_metadata
 
-def _build_filters_card(df):
-    # Safely calculate ranges
-    prof_min = 0
-    prof_max = 100_000_000
-    bud_min = 0
-    bud_max = 200_000_000
-    
-    if 'Profit (USD)' in df.columns and df['Profit (USD)'].notna().any():
-        prof_min = int(df['Profit (USD)'].min())
-        prof_max = int(df['Profit (USD)'].max())
-        
-    if 'Production Budget (USD)' in df.columns and df['Production Budget (USD)'].notna().any():
-        bud_min = int(df['Production Budget (USD)'].min())
-        bud_max = int(df['Production Budget (USD)'].max())
-
-    genres = []
-    if 'Genre' in df.columns and not df.empty:
-        genres = sorted(df['Genre'].dropna().unique())
+def _build_filters_card(meta):
+    prof_min, prof_max = meta.profit_range
+    bud_min, bud_max = meta.budget_range
 
     return dbc.Card(
         dbc.CardBody([
             dbc.Row([
                 dbc.Col([
                     dbc.Label("Profit Range (USD)"),
-                    dcc.RangeSlider(
+                    range_slider(
                         id="filter-profit",
                         min=prof_min,
                         max=prof_max,
@@ -42,7 +30,7 @@ def _build_filters_card(df):
                 ], md=6),
                 dbc.Col([
                     dbc.Label("Budget Range (USD)"),
-                    dcc.RangeSlider(
+                    range_slider(
                         id="filter-budget",
                         min=bud_min,
                         max=bud_max,
@@ -74,7 +62,7 @@ def _build_filters_card(df):
                     dbc.Label("Genre (Optional)"),
                     dcc.Dropdown(
                         id="filter-genre-fin",
-                        options=[{"label": g, "value": g} for g in genres],
+                        options=meta.genre_options,
                         multi=True,
                         placeholder="Select genres...",
                         clearable=True
@@ -86,15 +74,17 @@ def _build_filters_card(df):
     )
 
 def layout(app):
-    df = load_movies()
-    
+    return _build_layout()
+
+@cached_per_dataset
+def _build_layout():
     header = dbc.Container([
         html.H2("Financial Analysis", className="mb-2"),
         html.P("Profitability & ROI insights across movies and genres", className="text-muted")
     ], className="my-4")
     
     # Collapsible filter area
-    filters_card = _build_filters_card(df)
+    filters_card = _build_filters_card(dataset_metadata())
     filter_collapse = html.Div([
         dbc.Button(
             "📊 Show Filters", 
@@ -137,6 +127,16 @@ def layout(app):
         ),
     ], className='mb-4')
 
+    # Shown while the chart job runs (see update_financial_charts)
+    progress = dbc.Progress(
+        id='fin-charts-progress',
+        value=0,
+        striped=True,
+        animated=True,
+        style={"visibility": "hidden"},
+        className="mb-2",
+    )
+
     # Charts
     charts = dbc.Row([
         dbc.Col(
@@ -168,19 +168,14 @@ def layout(app):
         header, 
         filter_collapse, 
         top_kpis, 
+        progress,
         charts, 
-        more_charts
+        more_charts,
+        dcc.Store(id='fin-figure-signatures'),
+        dcc.Store(id='fin-kpi-values'),
     ], className="container-fluid")
 
 def register_callbacks(app):
-    @app.callback(
-        Output("collapse-fin-filters", "is_open"),
-        Input("btn-toggle-fin-filters", "n_clicks"),
-        prevent_initial_call=True
-    )
-    def toggle_filters(n):
-        if n is None:
-            return True
-        return n % 2 == 1
-    
+    register_collapse_toggle(app, "btn-toggle-fin-filters", "collapse-fin-filters")
+
     register_financial_callbacks(app)
\ No newline at end of file
@@ -1,20 +1,21 @@
 # src/pages/home.py
 
-from dash import html, dcc
+from dash import html, dcc, dash_table
 import dash_bootstrap_components as dbc
 
-from src.utils.data_loader import load_movies
+from src.utils.data_loader import cached_per_dataset
 from src.layouts.main_layouts import kpi_card
-from src.callbacks.home_callbacks import register_callbacks as register_home_callbacks
+from src.utils.filter_inputs import range_slider
+from src.utils.metadata import dataset_metadata
+from src.callbacks.home_callbacks import TABLE_COLUMNS, register_callbacks as register_home_callbacks
 
 def layout(app):
-    df = load_movies()
-    years = sorted(df['Year'].dropna().astype(int).unique()) if 'Year' in df.columns else []
-    genres = sorted(df['Genre'].dropna().unique()) if 'Genre' in df.columns else []
+    return _build_layout()
 
-    year_min = int(min(years)) if years else 2000
-    year_max = int(max(years)) if years else 2025
-    year_marks = {y: str(y) for y in range(year_min, year_max + 1, 10)}
+@cached_per_dataset
+def _build_layout():
+    meta = dataset_metadata()
+    year_min, year_max = meta.year_range
 
     header = dbc.Container([
         html.H2("Home"),
@@ -33,14 +34,14 @@ def layout(app):
             dbc.Row([
                 dbc.Col([
                     html.Label("Genre"),
-                    dcc.Dropdown(options=[{"label": g, "value": g} for g in genres], multi=True, id='filter-genre')
+                    dcc.Dropdown(options=meta.genre_options, multi=True, id='filter-genre')
                 ], md=4),
                 dbc.Col([
                     html.Label("Year Range"),
-                    dcc.RangeSlider(
+                    range_slider(
                         id="filter-year",
                         min=year_min, max=year_max, value=[year_min, year_max],
-                        marks=year_marks,
+                        marks=meta.year_marks(10),
                         tooltip={"placement": "bottom", "always_visible": False},
                     )
                 ], md=6),
@@ -59,14 +60,33 @@ def layout(app):
         dbc.Col(dcc.Graph(id='chart-studios-treemap'), md=6),
     ], className='mt-3')
 
-    table = dbc.Row([dbc.Col(html.Div(id='table-container'))], className='mt-3')
+    # Paged, sorted and filtered on the server (see update_table)
+    movies_table = dash_table.DataTable(
+        id='movies-table',
+        columns=[
+            {"name": c, "id": c, "type": "text" if c in ("Movie Name", "Genre") else "numeric"}
+            for c in TABLE_COLUMNS
+        ],
+        page_current=0,
+        page_size=10,
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="single",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
+    )
+    table = dbc.Row([dbc.Col(html.Div(movies_table, id='table-container'))], className='mt-3')
 
     # Collapsible sections for extra notebook items (kept on home)
     extra = dbc.Collapse([
         dbc.Card(dbc.CardBody([html.H5("Extra analysis from notebook"), html.P("Placeholder for additional visuals.")]))
     ], id="home-extra-collapse", is_open=False)
 
-    return html.Div([header, kpis, controls, main_charts, more_charts, table, extra])
+    figure_signatures = dcc.Store(id='home-figure-signatures')
+    kpi_values = dcc.Store(id='home-kpi-values')
+
+    return html.Div([header, kpis, controls, main_charts, more_charts, table, extra, figure_signatures, kpi_values])
 
 def register_callbacks(app):
     register_home_callbacks(app)
\ No newline at end of file
@@ -1,25 +1,16 @@
 # src/pages/video_sales.py
 
 import dash_bootstrap_components as dbc
-from dash import dcc, html, Input, Output
+from dash import dcc, html
 
-from src.utils.data_loader import load_movies
+from src.utils.data_loader import cached_per_dataset
 from src.callbacks.video_callbacks import register_callbacks as register_video_callbacks
+from src.utils.clientside import register_collapse_toggle
+from src.utils.filter_inputs import range_slider
+from src.utils.metadata import dataset_metadata
 
-def _build_filters_card(df):
-    # Safely get years
-    years = []
-    if 'Year' in df.columns and not df.empty:
-        years = sorted(df['Year'].dropna().unique())
-        years = [int(y) for y in years if str(y).isdigit()]
-    
-    year_min = int(min(years)) if years else 2000
-    year_max = int(max(years)) if years else 2025
-    
-    # Safely get studios
-    studios = []
-    if 'Production/Financing Companies' in df.columns and not df.empty:
-        studios = sorted(df['Production/Financing Companies'].dropna().unique())
+def _build_filters_card(meta):
+    year_min, year_max = meta.year_range
 
     return dbc.Card(
         dbc.CardBody([
@@ -50,12 +41,12 @@ def _build_filters_card(df):
 
                 dbc.Col([
                     dbc.Label("Year Range"),
-                    dcc.RangeSlider(
+                    range_slider(
                         id="filter-year-video",
                         min=year_min,
                         max=year_max,
                         value=[year_min, year_max],
-                        marks={y: str(y) for y in range(year_min, year_max + 1, (year_max - year_min) // 5)},
+                        marks=meta.year_marks((year_max - year_min) // 5),
                         tooltip={"placement": "bottom", "always_visible": False},
                     )
                 ], md=4),
@@ -64,7 +55,7 @@ def _build_filters_card(df):
                     dbc.Label("Studio"),
                     dcc.Dropdown(
                         id="filter-studio",
-                        options=[{"label": s, "value": s} for s in studios],
+                        options=meta.studio_options,
                         placeholder="Filter by studio (optional)",
                         clearable=True
                     )
@@ -75,14 +66,16 @@ def _build_filters_card(df):
     )
 
 def layout(app):
-    df = load_movies()
-    
+    return _build_layout()
+
+@cached_per_dataset
+def _build_layout():
     header = dbc.Container([
         html.H2("Video Sales", className="mb-2"),
         html.P("DVD / Blu-ray sales analysis and trends", className="text-muted")
     ], className="my-4")
 
-    filters_card = _build_filters_card(df)
+    filters_card = _build_filters_card(dataset_metadata())
     
     filter_collapse = html.Div([
         dbc.Button(
@@ -134,20 +127,13 @@ def layout(app):
         header, 
         filter_collapse, 
         kpis, 
-        charts
+        charts,
+        dcc.Store(id='video-kpi-values'),
     ], className="container-fluid")
 
 def register_callbacks(app):
-    # Wire the collapse toggle
-    @app.callback(
-        Output("collapse-video-filters", "is_open"),
-        Input("btn-toggle-video-filters", "n_clicks"),
-        prevent_initial_call=True
-    )
-    def toggle_filters(n):
-        if n is None:
-            return True
-        return n % 2 == 1
+    # Wire the collapse toggle (runs in the browser)
+    register_collapse_toggle(app, "btn-toggle-video-filters", "collapse-video-filters")
 
     # Register page callbacks
     register_video_callbacks(app)
\ No newline at end of file
@@ -0,0 +1,26 @@
+# preprocessing/build_snapshot.py
+
+"""Write the cleaned movie table to a Feather snapshot.
+
+Run as part of the build so workers start from the snapshot instead of
+re-parsing and re-cleaning the CSV:
+
+    python -m src.preprocessing.build_snapshot
+"""
+
+import time
+
+from src.utils.constants import DATA_PATH, SNAPSHOT_PATH
+from src.utils.data_loader import read_movies_csv, write_snapshot
+from src.preprocessing.clean_data_types import memory_report
+
+def main():
+    start = time.perf_counter()
+    df = read_movies_csv(DATA_PATH)
+    write_snapshot(df, DATA_PATH, SNAPSHOT_PATH)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {len(df)} rows x {len(df.columns)} columns to {SNAPSHOT_PATH} in {elapsed:.2f}s")
+    print(f"In-memory size: {sum(memory_report(df).values()) / 1e6:.2f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,187 @@
-import re
+# preprocessing/clean_data.py
+
+"""Ingest a raw movie export into a partitioned Parquet dataset.
+
+The export is streamed in chunks, so memory use depends on the chunk
+size, not on the export:
+
+1. the money and share columns are read on their own (twice) to get
+   their exact medians without holding them (see column_medians)
+2. every chunk is cleaned (release date parts, money, share, theater
+   counts), gaps in the money and share columns are filled with those
+   medians, and the chunk is appended to the dataset
+
+The output is partitioned by Release Year (hive layout); read it with
+read_cleaned_dataset() or ``pd.read_parquet(path, partitioning=PARTITIONING)``.
+
+    python -m src.preprocessing.clean_data --input export.csv --chunksize 200000
+"""
+
+import argparse
+import os
+import shutil
+import time
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.preprocessing.clean_data_types import fix_numeric_column, parse_theater_counts
+from src.utils.constants import DATA_PATH, CLEANED_DATASET_PATH
+from src.utils.sketch import LogBuckets
+
+# Rows per chunk; peak memory is a few times one chunk
+CHUNK_SIZE = 100_000
+
+# Rows read up front to tell numeric columns from text
+SAMPLE_ROWS = 10_000
+
+# Columns whose name contains one of these hold money amounts
+MONEY_KEYWORDS = ["gross", "budget", "revenue", "box office"]
+
+SHARE_COL = "Domestic Share Percentage"
+
+PARTITION_COL = "Release Year"
+PARTITIONING = ds.partitioning(pa.schema([(PARTITION_COL, pa.int16())]), flavor="hive")
+
+# Magnitudes the median search tells apart (cents to tens of trillions);
+# values outside share the end buckets
+SKETCH_SPAN = (1e-2, 1e13)
+
+def money_columns(columns):
+    return [c for c in columns if any(x in c.lower() for x in MONEY_KEYWORDS)]
+
+def _chunks(path, chunksize, **kwargs):
+    # Everything as text: each chunk is typed by the cleaning steps,
+    # so dtypes cannot drift from one chunk to the next
+    return pd.read_csv(path, chunksize=chunksize, dtype=str, **kwargs)
+
+# ---------------------------------------------------------
+# Pass 1: medians
+# ---------------------------------------------------------
+def column_medians(path, columns, chunksize=CHUNK_SIZE):
+    """Exact median of each numeric column, in two streaming reads.
+
+    The first read sketches each column to find the bucket (about 2%
+    wide) holding its middle rank. The second keeps only the values
+    falling in that bucket and picks the median among them.
+    """
+    buckets = LogBuckets.spanning(*SKETCH_SPAN)
+    sketches = {col: np.zeros(buckets.size, dtype="int64") for col in columns}
+    for chunk in _chunks(path, chunksize, usecols=columns):
+        for col in columns:
+            sketches[col] += buckets.sketch(fix_numeric_column(chunk[col], errors="coerce"))
+
+    # Middle ranks (two for an even count, averaged like pandas) and their buckets
+    targets = {}
+    for col, counts in sketches.items():
+        cum = np.cumsum(counts)
+        if cum[-1]:
+            ranks = np.array([(cum[-1] - 1) // 2, cum[-1] // 2])
+            targets[col] = (ranks, np.searchsorted(cum, ranks, side="right"), cum)
+
+    kept = {col: [] for col in targets}
+    if targets:
+        for chunk in _chunks(path, chunksize, usecols=list(targets)):
+            for col, (_, median_buckets, _) in targets.items():
+                values = fix_numeric_column(chunk[col], errors="coerce").to_numpy()
+                kept[col].append(values[np.isin(buckets.index(values), median_buckets)])
+
+    medians = {col: np.nan for col in columns}
+    for col, (ranks, median_buckets, cum) in targets.items():
+        values = np.sort(np.concatenate(kept[col]))
+        first = median_buckets.min()
+        before = cum[first - 1] if first else 0
+        medians[col] = float(values[ranks - before].mean())
+    return medians
+
+# ---------------------------------------------------------
+# Pass 2: clean and write
+# ---------------------------------------------------------
+def clean_chunk(df, numeric_cols, medians):
+    """Clean one chunk of the export; ``medians`` fill the money and share gaps."""
+    # --- Release date parts ---
+    df["Release Date"] = pd.to_datetime(df["Release Date"], errors="coerce")
+    df["Release Year"] = df["Release Date"].dt.year.astype("Int16")
+    df["Release Month"] = df["Release Date"].dt.month.astype("Int8")
+    df["Release Quarter"] = df["Release Date"].dt.quarter.astype("Int8")
+
+    # --- Numeric columns, gaps in money and share filled with the medians ---
+    for col in numeric_cols:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col, median in medians.items():
+        df[col] = fix_numeric_column(df[col], errors="coerce").fillna(median)
+
+    # --- Theater counts ---
+    if "Theater counts" in df.columns:
+        df[["Opening Theaters", "Max Theaters"]] = parse_theater_counts(df["Theater counts"])
+        df = df.drop(columns=["Theater counts"])
+
+    return df
+
+def _arrow_schema(table):
+    """The first chunk's schema, with all-missing (null) columns as strings."""
+    return pa.schema([
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in table.schema
+    ])
+
+def ingest(input_path=DATA_PATH, output_path=CLEANED_DATASET_PATH, chunksize=CHUNK_SIZE):
+    """Stream ``input_path`` into a Parquet dataset at ``output_path``.
+
+    The dataset is written next to the target and moved into place at
+    the end, so readers never see a half-written one. Returns the
+    number of rows written.
+    """
+    sample = pd.read_csv(input_path, nrows=SAMPLE_ROWS)
+    impute_cols = money_columns(sample.columns) + ([SHARE_COL] if SHARE_COL in sample.columns else [])
+    numeric_cols = [
+        c for c in sample.columns
+        if c not in impute_cols and pd.api.types.is_numeric_dtype(sample[c])
+    ]
+
+    medians = column_medians(input_path, impute_cols, chunksize)
+
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+
+    schema, rows = None, 0
+    for i, chunk in enumerate(_chunks(input_path, chunksize)):
+        chunk = clean_chunk(chunk, numeric_cols, medians)
+        table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+        if schema is None:
+            schema = _arrow_schema(table)
+            table = table.cast(schema)
+        pq.write_to_dataset(
+            table, tmp_path,
+            partition_cols=[PARTITION_COL],
+            basename_template=f"chunk-{i:05d}-{{i}}.parquet",
+        )
+        rows += len(chunk)
+
+    if output_path.exists():
+        shutil.rmtree(output_path)
+    os.replace(tmp_path, output_path)
+    return rows
+
+def read_cleaned_dataset(path=CLEANED_DATASET_PATH, **kwargs):
+    """Read the ingested dataset (or part of it, with ``filters``) into pandas."""
+    return pd.read_parquet(path, partitioning=PARTITIONING, **kwargs)
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean a raw movie export into a partitioned Parquet dataset.")
+    parser.add_argument("--input", type=Path, default=DATA_PATH, help="raw CSV export")
+    parser.add_argument("--output", type=Path, default=CLEANED_DATASET_PATH, help="output dataset directory")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="rows per chunk")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = ingest(args.input, args.output, args.chunksize)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {rows} rows to {args.output} in {elapsed:.2f}s")
 
-# Load file
-df = pd.read_csv('/mnt/data/Top Movies (Cleaned Data).csv')
-
-# --- 1: Extract Release Year, Month, Quarter ---
-df['Release Date'] = pd.to_datetime(df['Release Date'], errors='coerce')
-df['Release Year'] = df['Release Date'].dt.year
-df['Release Month'] = df['Release Date'].dt.month
-df['Release Quarter'] = df['Release Date'].dt.quarter
-
-# --- Helper: Clean numeric columns ---
-def clean_numeric(col):
-    df[col] = (
-        df[col].astype(str)
-        .str.replace(",", "", regex=False)
-        .str.replace("$", "", regex=False)
-        .str.strip()
-        .replace("nan", np.nan)
-    )
-    df[col] = pd.to_numeric(df[col], errors='coerce')
-    df[col] = df[col].fillna(df[col].median())
-
-# Identify numeric-money-like columns
-num_cols = [
-    c for c in df.columns 
-    if any(x in c.lower() for x in ["gross", "budget", "revenue", "box office"])
-]
-
-for col in num_cols:
-    clean_numeric(col)
-
-# --- 3: Convert numeric for Domestic Share Percentage ---
-df['Domestic Share Percentage'] = (
-    df['Domestic Share Percentage']
-    .astype(str)
-    .str.replace("%", "", regex=False)
-    .str.strip()
-)
-df['Domestic Share Percentage'] = pd.to_numeric(
-    df['Domestic Share Percentage'], errors='coerce'
-)
-df['Domestic Share Percentage'] = df['Domestic Share Percentage'].fillna(
-    df['Domestic Share Percentage'].median()
-)
-
-# --- 4: Extract theater counts ---
-def extract_theaters(text):
-    if pd.isna(text):
-        return np.nan, np.nan
-    match = re.match(r"([0-9,]+) opening theaters/([0-9,]+) max. theaters", str(text))
-    if match:
-        opening = int(match.group(1).replace(",", ""))
-        maximum = int(match.group(2).replace(",", ""))
-        return opening, maximum
-    return np.nan, np.nan
-
-df["Opening Theaters"], df["Max Theaters"] = zip(*df["Theater counts"].map(extract_theaters))
-df = df.drop(columns=["Theater counts"])
-
-# --- Save cleaned data ---
-output_path = "/mnt/data/movies_cleaned_dashboard.csv"
-df.to_csv(output_path, index=False)
-
-output_path
+if __name__ == "__main__":
+    main()
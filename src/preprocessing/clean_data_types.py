@@ -1,23 +1,86 @@
 # preprocessing/clean_data_types.py
 
-import re
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
-def fix_numeric_column(series):
-    """Convert a messy numeric column to clean float or int."""
-    return (
-        series.astype(str)
-        .str.replace(",", "", regex=False)
-        .str.replace("$", "", regex=False)
-        .str.replace("%", "", regex=False)
-        .str.strip()
-        .replace({"nan": np.nan, "": np.nan})
-        .astype(float)
+# Dropped before parsing a number: currency, thousands separators, percent
+_NUMBER_NOISE = ["$", ",", "%"]
+
+# "3,094 opening theaters/3,182 max. theaters, ..." in any case, with
+# singular "theater", "max" without the period and loose spacing
+THEATER_COUNTS_PATTERN = (
+    r"(?i)^\s*(?P<opening>[0-9][0-9,]*)\s+opening\s+theaters?\s*/"
+    r"\s*(?P<max>[0-9][0-9,]*)\s+max\.?\s+theaters?\b"
+)
+
+def _as_text(series):
+    """``series`` with every present value as a string; missing values stay missing."""
+    if pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+        return series
+    return series.where(series.isna(), series.astype(str))
+
+def fix_numeric_column(series, errors="raise"):
+    """Convert a messy numeric column to clean float.
+
+    Columns that are already numeric are only cast to float. Text goes
+    through Arrow string kernels once: noise characters and surrounding
+    whitespace removed, empty strings made missing, then a native cast
+    to float. Missing values stay missing throughout. Values Arrow
+    cannot parse are left to pd.to_numeric (``errors`` as there).
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype("float64")
+
+    text = pa.array(_as_text(series), type=pa.string(), from_pandas=True)
+    for noise in _NUMBER_NOISE:
+        text = pc.replace_substring(text, noise, "")
+    text = pc.utf8_trim_whitespace(text)
+    text = pc.if_else(pc.equal(text, ""), pa.scalar(None, pa.string()), text)
+    try:
+        values = pc.cast(text, pa.float64()).to_numpy(zero_copy_only=False)
+    except pa.ArrowInvalid:
+        values = pd.to_numeric(text.to_pandas(), errors=errors).to_numpy(dtype="float64")
+    return pd.Series(values, index=series.index, name=series.name)
+
+def parse_theater_counts(series):
+    """Opening and maximum theater counts from a "Theater counts" column.
+
+    Returns a DataFrame with float columns "Opening Theaters" and "Max
+    Theaters", missing where a value does not match
+    THEATER_COUNTS_PATTERN. The text is held as Arrow strings, so
+    str.extract runs as one native regex pass over the column.
+    """
+    text = _as_text(series).astype(pd.ArrowDtype(pa.string()))
+    counts = text.str.extract(THEATER_COUNTS_PATTERN)
+    return pd.DataFrame({
+        "Opening Theaters": fix_numeric_column(counts["opening"]),
+        "Max Theaters": fix_numeric_column(counts["max"]),
+    })
+
+def normalize_text_column(series):
+    """Strip whitespace and turn non-breaking spaces into plain spaces.
+
+    String-dtype columns use the vectorized string methods. Object
+    columns are cleaned once per distinct value, so repetitive columns
+    (genres, ratings, ...) cost about as much as their categories.
+    Missing values and non-string values are left as they are.
+    """
+    if series.dtype != object:
+        return series.str.strip().str.replace("\xa0", " ", regex=False)
+
+    codes, uniques = pd.factorize(series)
+    cleaned = pd.Index(
+        [v.strip().replace("\xa0", " ") if isinstance(v, str) else v for v in uniques],
+        dtype=object,
     )
+    values = cleaned.take(codes, allow_fill=True, fill_value=np.nan)
+    return pd.Series(values, index=series.index, name=series.name)
 
 def clean_movie_dtypes(df: pd.DataFrame):
-    df = df.copy()
+    # Columns are replaced, never modified in place
+    df = df.copy(deep=False)
 
     # -----------------------------------
     # 1. Clean numeric money columns
@@ -52,13 +115,7 @@ def clean_movie_dtypes(df: pd.DataFrame):
     # 3. Clean percentage columns
     # -----------------------------------
     if "Domestic Share Percentage" in df.columns:
-        df["Domestic Share Percentage"] = (
-            df["Domestic Share Percentage"]
-            .astype(str)
-            .str.replace("%", "", regex=False)
-            .str.strip()
-        )
-        df["Domestic Share Percentage"] = pd.to_numeric(
+        df["Domestic Share Percentage"] = fix_numeric_column(
             df["Domestic Share Percentage"], errors="coerce"
         )
 
@@ -76,18 +133,65 @@ def clean_movie_dtypes(df: pd.DataFrame):
     # -----------------------------------
     # 5. Normalize text columns
     # -----------------------------------
-    for col in df.select_dtypes(include="object").columns:
-        df[col] = (
-            df[col]
-            .astype(str)
-            .str.strip()
-            .str.replace("\xa0", " ", regex=False)  # remove weird unicode space
-            .replace({"nan": np.nan})              # remove "nan" strings
-        )
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        df[col] = normalize_text_column(df[col])
 
     # -----------------------------------
     # 6. Ensure consistent column dtypes summary
     # -----------------------------------
     dtype_report = df.dtypes.to_dict()
 
-    return df, dtype_report
\ No newline at end of file
+    return df, dtype_report
+
+# -----------------------------------
+# Compact in-memory layout
+# -----------------------------------
+CATEGORY_COLS = [
+    "Genre",
+    "MPAA Rating",
+    "Source",
+    "Production Method",
+    "Creative Type",
+    "Franchise",
+]
+
+# Other text columns become categorical when values repeat this much
+CATEGORY_MAX_RATIO = 0.5
+
+SMALL_INT_COLS = {
+    "Year": "Int16",
+    "Release Month": "Int8",
+    "Opening Theaters": "Int32",
+    "Max Theaters": "Int32",
+}
+
+def _downcast_float(series):
+    """Return a float32 copy if it round-trips exactly, else the series."""
+    small = series.astype("float32")
+    if np.array_equal(small.to_numpy("float64"), series.to_numpy("float64"), equal_nan=True):
+        return small
+    return series
+
+def memory_report(df: pd.DataFrame):
+    """Deep memory usage in bytes per column."""
+    return df.memory_usage(deep=True, index=False).to_dict()
+
+def compact_movie_dtypes(df: pd.DataFrame):
+    df = df.copy()
+
+    # Low-cardinality text → categorical (one copy of each distinct string)
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        values = df[col].dropna()
+        if col in CATEGORY_COLS or values.nunique() <= CATEGORY_MAX_RATIO * len(values):
+            df[col] = df[col].astype("category")
+
+    # Whole-number columns → nullable small ints
+    for col, dtype in SMALL_INT_COLS.items():
+        if col in df.columns:
+            df[col] = df[col].round().astype(dtype)
+
+    # Floats → float32 only where no value changes
+    for col in df.select_dtypes(include="float64").columns:
+        df[col] = _downcast_float(df[col])
+
+    return df, memory_report(df)
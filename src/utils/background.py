@@ -0,0 +1,63 @@
+# src/utils/background.py
+
+"""Background callbacks on a local, diskcache-backed job queue.
+
+Opt-in with BACKGROUND_CALLBACKS=1 (needs ``dash[diskcache]``);
+otherwise the same callbacks run inline in the request, which is the
+faster choice for this app's chart builds.
+
+Each job runs in its own forked process, so a slow figure build does
+not hold a gunicorn worker thread. The browser polls for progress and
+the result. When a callback fires again while its job is still
+running, Dash terminates the old job. The price: the process starts
+with the worker's caches as they were at fork time and its own fills
+(selections, LOWESS fits) are lost with it, the REQUEST_GATE does not
+see other jobs, and forking a threaded worker can copy a held lock.
+"""
+
+import functools
+import os
+
+from src.utils.constants import CALLBACK_CACHE_DIR
+
+# Milliseconds between the browser's job status polls
+BACKGROUND_POLL_MS = 250
+
+def _make_manager():
+    if os.environ.get("BACKGROUND_CALLBACKS", "0") != "1":
+        return None
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+    except ImportError:
+        return None
+    return DiskcacheManager(diskcache.Cache(str(CALLBACK_CACHE_DIR)))
+
+BACKGROUND_MANAGER = _make_manager()
+
+def _no_progress(*_):
+    pass
+
+def background_callback(app, *dependencies, progress=None, running=None, cancel=None):
+    """``app.callback`` that runs the function as a background job if it can.
+
+    The function always takes ``set_progress`` as its first argument,
+    as Dash passes it to background callbacks; inline it is a no-op.
+    """
+    def decorator(func):
+        if BACKGROUND_MANAGER is None:
+            @functools.wraps(func)
+            def inline(*args):
+                return func(_no_progress, *args)
+            return app.callback(*dependencies)(inline)
+
+        return app.callback(
+            *dependencies,
+            background=True,
+            manager=BACKGROUND_MANAGER,
+            progress=progress,
+            running=running,
+            cancel=cancel,
+            interval=BACKGROUND_POLL_MS,
+        )(func)
+    return decorator
@@ -0,0 +1,48 @@
+# src/utils/clientside.py
+
+"""Wiring for the browser-side callbacks in assets/clientside.js."""
+
+from dash import ClientsideFunction, Input, Output, State
+
+def register_collapse_toggle(app, button_id, collapse_id):
+    """Open/close a dbc.Collapse from a button without a server call."""
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="toggle"),
+        Output(collapse_id, "is_open"),
+        Input(button_id, "n_clicks"),
+        State(collapse_id, "is_open"),
+        prevent_initial_call=True,
+    )
+
+def register_kpi_formatter(app, store_id, kpi_ids):
+    """Format the raw KPI values in ``store_id`` into the ``kpi_ids`` texts.
+
+    The store holds one ``kpi_value(...)`` pair per KPI, in ``kpi_ids`` order.
+    """
+    app.clientside_callback(
+        ClientsideFunction(namespace="kpi", function_name="format"),
+        [Output(kpi_id, "children") for kpi_id in kpi_ids],
+        Input(store_id, "data"),
+    )
+
+def register_debounce(app, source_id, source_prop, target_id, target_prop, delay_ms):
+    """Copy ``source_prop`` to ``target_prop`` once it has settled for ``delay_ms``."""
+    app.clientside_callback(
+        f"""
+        function (value) {{
+            return window.dash_clientside.ui.debounce("{target_id}", value, {int(delay_ms)});
+        }}
+        """,
+        Output(target_id, target_prop),
+        Input(source_id, source_prop),
+        prevent_initial_call=True,
+    )
+
+def register_session_id(app, store_id, trigger_id, trigger_prop):
+    """Give each browser tab a random id in ``store_id`` (sessionStorage)."""
+    app.clientside_callback(
+        ClientsideFunction(namespace="ui", function_name="sessionId"),
+        Output(store_id, "data"),
+        Input(trigger_id, trigger_prop),
+        State(store_id, "data"),
+    )
@@ -0,0 +1,53 @@
+# src/utils/companies.py
+
+import numpy as np
+import pandas as pd
+
+COMPANY_COL = "Production/Financing Companies"
+
+# Values that stand for "no company" rather than a real studio
+PLACEHOLDER_COMPANIES = {"unknown", "n/a", "na"}
+
+class CompanyIndex:
+    """Movie-to-company bridge for the comma-separated companies column.
+
+    ``rows`` and ``codes`` are parallel arrays with one entry per
+    (movie, company) pair: the movie's row position in the full table
+    and the company's position in ``names`` (sorted alphabetically).
+    Per-company row positions are kept contiguous so a studio filter
+    is a slice, not a string search.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+
+        companies = (
+            df[COMPANY_COL].dropna().astype(str)
+            .str.split(",")
+            .explode()
+            .str.strip()
+        )
+        companies = companies[companies != ""]
+
+        codes, names = pd.factorize(companies, sort=True)
+        self.names = pd.Index(names, name="Company")
+        self.rows = companies.index.to_numpy(dtype="int64")
+        self.codes = codes
+        self.is_placeholder = self.names.str.lower().isin(PLACEHOLDER_COMPANIES)
+
+        # Rows grouped by company: positions of company i are
+        # _by_company[_offsets[i]:_offsets[i + 1]]
+        order = np.argsort(codes, kind="stable")
+        self._by_company = self.rows[order]
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(names)))])
+
+    def real_companies(self):
+        """Company names without placeholders like "Unknown"."""
+        return self.names[~self.is_placeholder]
+
+    def positions(self, company):
+        """Sorted row positions of the movies credited to ``company``."""
+        code = self.names.get_indexer([company])[0]
+        if code < 0:
+            return np.empty(0, dtype="int64")
+        return self._by_company[self._offsets[code]:self._offsets[code + 1]]
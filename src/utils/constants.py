@@ -4,3 +4,12 @@ from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 DATA_PATH = ROOT_DIR / "data" / "interim" / "Top Movies (Cleaned Data).csv"
+
+# Cleaned, typed copy of DATA_PATH (see src/preprocessing/build_snapshot.py)
+SNAPSHOT_PATH = ROOT_DIR / "data" / "processed" / "movies_snapshot.feather"
+
+# Partitioned Parquet output of the ingestion CLI (see src/preprocessing/clean_data.py)
+CLEANED_DATASET_PATH = ROOT_DIR / "data" / "processed" / "movies_cleaned"
+
+# Job queue and results of background callbacks (see src/utils/background.py)
+CALLBACK_CACHE_DIR = ROOT_DIR / "data" / "cache" / "callbacks"
@@ -0,0 +1,259 @@
+# src/utils/cube.py
+
+"""Pre-aggregated movie cube for the charts' rollups.
+
+Most charts are a sum, count or median of one measure over genre and
+year. The cube keeps those per cell, built once per dataset version,
+so a filtered rollup adds up a fixed number of cells instead of
+grouping the rows:
+
+- row counts and measure sums over genre × year × MPAA rating
+- a quantile sketch (see sketch.py) per genre × year cell for the
+  median and box-plot measures, kept sparse: only occupied buckets
+- measure sums per company × genre × year, through the company bridge
+
+Sums and counts are exact; medians are within the sketch's relative
+accuracy. Each dimension has a slot for missing values, which by-group
+rollups leave out like pandas' groupby.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.utils.data_loader import load_movies, load_company_index, cached_per_dataset
+from src.utils.sketch import LogBuckets, sketch_box_stats, sketch_quantiles
+
+# Measures summed per cell (and per company)
+CUBE_SUM_MEASURES = ["Worldwide Gross (USD)", "Profit (USD)"]
+
+# Measures with a quantile sketch per genre × year cell
+CUBE_SKETCH_MEASURES = ["Worldwide Gross (USD)", "ROI (%)"]
+
+CUBE_DIMENSIONS = ["Genre", "Year", "MPAA Rating"]
+
+def _codes(series):
+    """Category codes with missing values in an extra last slot."""
+    codes, labels = pd.factorize(series, sort=True)
+    codes = np.where(codes < 0, len(labels), codes)
+    return codes, pd.Index(labels, name=series.name)
+
+def _year_codes(series):
+    """Offsets from the first year (every year in between gets a slot); missing last."""
+    years = series.to_numpy(dtype="float64", na_value=np.nan)
+    known = ~np.isnan(years)
+    first = int(years[known].min()) if known.any() else 0
+    last = int(years[known].max()) if known.any() else -1
+    labels = pd.Index(np.arange(first, last + 1), name=series.name)
+    codes = np.where(known, np.nan_to_num(years) - first, len(labels)).astype("int64")
+    return codes, labels
+
+def _cumulative(values):
+    """Prefix sums over the year axis (axis 1), starting from zero."""
+    start = np.zeros(values.shape[:1] + (1,) + values.shape[2:], dtype=values.dtype)
+    return np.concatenate([start, np.cumsum(values, axis=1, dtype=values.dtype)], axis=1)
+
+class MovieCube:
+    """Counts, sums and quantile sketches of the movie table by cell.
+
+    Count and sum arrays are stored as prefix sums over the year axis,
+    so any year range is the difference of two slices. The missing-year
+    slot comes last, which keeps every year selection a contiguous range.
+
+    A dense sketch array would be mostly zeros (a few thousand movies
+    over thousands of buckets per cell), so sketches are kept as the
+    occupied (genre, year, bucket) triples with their counts, like the
+    company cells, and added up per query.
+    """
+
+    def __init__(self, df, companies, sum_measures=CUBE_SUM_MEASURES, sketch_measures=CUBE_SKETCH_MEASURES):
+        genre, genres = _codes(df["Genre"])
+        year, years = _year_codes(df["Year"])
+        rating, ratings = _codes(df["MPAA Rating"])
+        self.labels = {"Genre": genres, "Year": years, "MPAA Rating": ratings}
+        self._genre_lookup = {g: code for code, g in enumerate(genres)}
+        self.years = years.to_numpy()
+
+        # Full cells: genre × year × rating, each with a missing slot
+        shape = (len(genres) + 1, len(years) + 1, len(ratings) + 1)
+        size = int(np.prod(shape))
+        cell = np.ravel_multi_index((genre, year, rating), shape)
+        self.counts = _cumulative(np.bincount(cell, minlength=size).reshape(shape))
+        self.sums = {
+            m: _cumulative(
+                np.bincount(cell, weights=df[m].to_numpy(dtype="float64", na_value=0.0), minlength=size).reshape(shape)
+            )
+            for m in sum_measures if m in df.columns
+        }
+
+        # Sketch cells: the occupied (genre, year, bucket) triples
+        self.buckets, self.sketches = {}, {}
+        for m in sketch_measures:
+            if m not in df.columns:
+                continue
+            values = df[m].to_numpy(dtype="float64", na_value=np.nan)
+            buckets = LogBuckets(values)
+            index = buckets.index(values)
+            keep = index >= 0
+            sketch_shape = shape[:2] + (buckets.size,)
+            key = np.ravel_multi_index((genre[keep], year[keep], index[keep]), sketch_shape)
+            cells, counts = np.unique(key, return_counts=True)
+            self.buckets[m] = buckets
+            self.sketches[m] = (
+                tuple(c.astype("int32") for c in np.unravel_index(cells, sketch_shape)),
+                counts.astype("int32"),
+            )
+
+        # Company cells: the distinct (company, genre, year) triples
+        rows = companies.rows
+        company_shape = (len(companies.names),) + shape[:2]
+        key = np.ravel_multi_index((companies.codes, genre[rows], year[rows]), company_shape)
+        cells, inverse = np.unique(key, return_inverse=True)
+        self.companies = companies.names
+        self._company_placeholder = companies.is_placeholder
+        self._company_cells = np.unravel_index(cells, company_shape)
+        self._company_counts = np.bincount(inverse, minlength=len(cells))
+        self._company_sums = {
+            m: np.bincount(inverse, weights=df[m].to_numpy(dtype="float64", na_value=0.0)[rows], minlength=len(cells))
+            for m in self.sums
+        }
+
+    def select(self, genres=None, year_range=None, require_year=False):
+        """Cells matching a genre list and an inclusive year range.
+
+        Without a year range, movies without a Year are included unless
+        ``require_year`` is set (the Home filters always drop them).
+        """
+        genre_mask = np.ones(len(self.labels["Genre"]) + 1, dtype=bool)
+        if genres:
+            genre_mask[:] = False
+            genre_mask[[self._genre_lookup[g] for g in genres if g in self._genre_lookup]] = True
+
+        if year_range:
+            start = int(np.searchsorted(self.years, year_range[0], side="left"))
+            stop = max(start, int(np.searchsorted(self.years, year_range[1], side="right")))
+        else:
+            start, stop = 0, len(self.years) + (0 if require_year else 1)
+
+        return CubeSlice(self, genre_mask, start, stop)
+
+class CubeSlice:
+    """Rollups over the cells picked by MovieCube.select."""
+
+    def __init__(self, cube, genre_mask, start, stop):
+        self.cube = cube
+        self._genre_mask = genre_mask
+        self._start, self._stop = start, stop
+
+    def _labels(self, by):
+        labels = self.cube.labels[by]
+        return labels[self._start:self._stop] if by == "Year" else labels
+
+    def _rollup(self, cumulative, by):
+        # cumulative: genre × year (prefix sums) × rating
+        if by == "Year":
+            values = np.diff(cumulative[:, self._start:self._stop + 1], axis=1)
+        else:
+            values = cumulative[:, self._stop] - cumulative[:, self._start]
+
+        if by == "Genre":
+            values = values * self._genre_mask.reshape((-1,) + (1,) * (values.ndim - 1))
+        else:
+            values = values[self._genre_mask].sum(axis=0)
+
+        if by != "MPAA Rating":
+            values = values.sum(axis=1 if by else 0)
+        if by is None:
+            return values
+        # Drop the grouping axis' missing slot
+        return values[:len(self._labels(by))]
+
+    def _sketch(self, measure, by):
+        """Bucket counts of ``measure``: one sketch, or one per ``by`` group."""
+        (genre, year, bucket), counts = self.cube.sketches[measure]
+        size = self.cube.buckets[measure].size
+        keep = self._genre_mask[genre] & (year >= self._start) & (year < self._stop)
+        if by is None:
+            group, n_groups = 0, 1
+        elif by == "Genre":
+            group, n_groups = genre[keep], len(self._genre_mask)
+        else:
+            group, n_groups = year[keep] - self._start, self._stop - self._start
+
+        sketch = np.bincount(group * size + bucket[keep], weights=counts[keep], minlength=n_groups * size)
+        sketch = sketch.astype("int64").reshape(n_groups, size)
+        if by is None:
+            return sketch[0]
+        # Drop the grouping axis' missing slot
+        return sketch[:len(self._labels(by))]
+
+    def _present(self, by):
+        return self._rollup(self.cube.counts, by) > 0
+
+    def count(self):
+        """Number of movies in the selection."""
+        return int(self._rollup(self.cube.counts, None))
+
+    def sum(self, measure, by=None):
+        """Total of ``measure``, or a Series per ``by`` group with movies."""
+        sums = self._rollup(self.cube.sums[measure], by)
+        if by is None:
+            return float(sums)
+        present = self._present(by)
+        return pd.Series(sums[present], index=self._labels(by)[present], name=measure)
+
+    def quantile(self, measure, qs, by=None):
+        """Approximate quantiles ``qs`` of ``measure``, per ``by`` group if given.
+
+        ``by`` may be "Genre" or "Year". Returns an array of len(qs), or
+        a DataFrame with one column per quantile.
+        """
+        if by not in (None, "Genre", "Year"):
+            raise ValueError(f"quantiles are not kept by {by!r}")
+        counts = self._sketch(measure, by)
+        values = sketch_quantiles(counts, self.cube.buckets[measure], qs)
+        if by is None:
+            return values
+        present = self._present(by)
+        return pd.DataFrame(values[present], index=self._labels(by)[present], columns=list(np.atleast_1d(qs)))
+
+    def box_stats(self, measure, by="Genre"):
+        """Approximate box-plot statistics of ``measure`` per ``by`` group.
+
+        A DataFrame with columns q1, median, q3, lowerfence and
+        upperfence (see sketch_box_stats), one row per group with movies.
+        """
+        if by not in ("Genre", "Year"):
+            raise ValueError(f"quantiles are not kept by {by!r}")
+        counts = self._sketch(measure, by)
+        stats = sketch_box_stats(counts, self.cube.buckets[measure])
+        present = self._present(by)
+        return pd.DataFrame({k: v[present] for k, v in stats.items()}, index=self._labels(by)[present])
+
+    def median(self, measure, by=None):
+        """Approximate median of ``measure``, or a Series per ``by`` group."""
+        if by is None:
+            return float(self.quantile(measure, [0.5])[0])
+        return self.quantile(measure, [0.5], by=by)[0.5].rename(measure)
+
+    def company_sum(self, measure, exclude_placeholders=False):
+        """Sum of ``measure`` per company with movies in the selection.
+
+        Missing values count as zero. ``exclude_placeholders`` leaves
+        out names like "Unknown" (see CompanyIndex).
+        """
+        company, genre, year = self.cube._company_cells
+        keep = self._genre_mask[genre] & (year >= self._start) & (year < self._stop)
+        n = len(self.cube.companies)
+        sums = np.bincount(company[keep], weights=self.cube._company_sums[measure][keep], minlength=n)
+        counts = np.bincount(company[keep], weights=self.cube._company_counts[keep], minlength=n)
+
+        present = counts > 0
+        if exclude_placeholders:
+            present &= ~self.cube._company_placeholder
+        return pd.Series(sums[present], index=self.cube.companies[present], name=measure)
+
+@cached_per_dataset
+def movie_cube():
+    """Aggregate cube of the movie table (see MovieCube)."""
+    columns = CUBE_DIMENSIONS + sorted(set(CUBE_SUM_MEASURES) | set(CUBE_SKETCH_MEASURES))
+    return MovieCube(load_movies(columns), load_company_index())
@@ -1,29 +1,248 @@
 # src/utils/data_loader.py
 
+import os
+import hashlib
+import functools
+import threading
+
 import pandas as pd
-from .constants import DATA_PATH
+import pyarrow as pa
+import pyarrow.feather as feather
+from .constants import DATA_PATH, SNAPSHOT_PATH
+from .companies import COMPANY_COL, CompanyIndex
+
+from src.preprocessing.clean_data_types import clean_movie_dtypes, compact_movie_dtypes
+
+
+def read_movies_csv(path=DATA_PATH):
+    """Parse and clean the raw CSV (the slow path)."""
+    df = pd.read_csv(path)
 
-from src.preprocessing.clean_data_types import clean_movie_dtypes
+    df, _ = clean_movie_dtypes(df)
 
-def load_movies():
-    df = pd.read_csv(DATA_PATH)
-    
-    df, dtype_report = clean_movie_dtypes(df)
-    
     # Parse cleanly
     df["Release Date"] = pd.to_datetime(df["Release Date"], errors="coerce")
-    
+
     # Extract year (may be NaN)
     df["Year"] = df["Release Date"].dt.year
-    
+
     # Fix future-year parsing errors (2062 → 1962)
     df.loc[df["Year"] > 2025, "Year"] -= 100
-    
+
     # Ensure dtype consistency
     df["Year"] = df["Year"].astype("float")   # allows NaN safely
-    
+
     df['Profit (USD)'] = df['Worldwide Gross (USD)'] - df['Production Budget (USD)']
     df['ROI (%)'] = (df['Profit (USD)'] / df['Production Budget (USD)']) * 100
 
+    # Categoricals, small ints and lossless float32 (see compact_movie_dtypes)
+    df, _ = compact_movie_dtypes(df)
+
+    return df
+
+
+# ---------------------------------------------------------
+# Columnar snapshot
+# ---------------------------------------------------------
+# Bump when the cleaning steps change so old snapshots are rebuilt
+SNAPSHOT_SCHEMA = "3"
+
+
+def _source_digest(path=DATA_PATH):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def write_snapshot(df, source_path=DATA_PATH, snapshot_path=SNAPSHOT_PATH):
+    """Write the cleaned frame as an uncompressed Feather file.
+
+    The source digest and schema version are stored in the file
+    metadata; a snapshot whose digest no longer matches the CSV is
+    ignored by the loader. The write is atomic so concurrent workers
+    never see a partial file.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"movies.source_digest": _source_digest(source_path).encode(),
+        b"movies.schema": SNAPSHOT_SCHEMA.encode(),
+    })
+
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, snapshot_path)
+
+
+def _read_snapshot(source_path=DATA_PATH, snapshot_path=SNAPSHOT_PATH):
+    """Return the snapshot frame, or None if it is missing or stale."""
+    if not snapshot_path.exists():
+        return None
+
+    try:
+        table = feather.read_table(snapshot_path, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    meta = table.schema.metadata or {}
+    if meta.get(b"movies.schema") != SNAPSHOT_SCHEMA.encode():
+        return None
+    if meta.get(b"movies.source_digest") != _source_digest(source_path).encode():
+        return None
+
+    return table
+
+
+def _open_dataset(version):
+    table = _read_snapshot()
+    if table is not None:
+        return _Dataset(version, table=table)
+
+    df = read_movies_csv()
+    try:
+        write_snapshot(df)
+    except OSError:
+        # Read-only checkout: keep serving from the CSV
+        return _Dataset(version, df=df)
+
+    # The CSV may have changed since it was read, making the new
+    # snapshot stale at once; serve the frame already in hand
+    table = _read_snapshot()
+    if table is None:
+        return _Dataset(version, df=df)
+    return _Dataset(version, table=table)
+
+
+# ---------------------------------------------------------
+# Process-wide dataset cache
+# ---------------------------------------------------------
+# One dataset per worker process, keyed on the data file's
+# (path, size, mtime). Replacing the CSV on disk changes the key,
+# so the next call reloads without restarting gunicorn.
+def _file_version(path=DATA_PATH):
+    stat = os.stat(path)
+    return (str(path), stat.st_size, stat.st_mtime_ns)
+
+
+class _Dataset:
+    """Cleaned movie table, materialized into pandas one column at a time.
+
+    Backed by the memory-mapped snapshot, so columns no callback asks
+    for (Keywords, Movie URL, ...) are never pulled into memory.
+    """
+
+    def __init__(self, version, table=None, df=None):
+        self.version = version
+        self._table = table
+        self._lock = threading.Lock()
+        self._derived = {}
+        # Re-entrant: one builder may use another (e.g. load_company_index)
+        self._derived_lock = threading.RLock()
+        if table is not None:
+            self.names = list(table.column_names)
+            self._columns = {}
+        else:
+            self.names = list(df.columns)
+            self._columns = dict(df.items())
+
+    def column(self, name):
+        series = self._columns.get(name)
+        if series is None:
+            with self._lock:
+                series = self._columns.get(name)
+                if series is None:
+                    series = self._table.select([name]).to_pandas()[name]
+                    self._columns[name] = series
+        return series
+
+    def frame(self, columns=None):
+        names = self.names if columns is None else [c for c in columns if c in self.names]
+        return pd.DataFrame({name: self.column(name) for name in names}, copy=False)
+
+    def derived(self, builder):
+        if builder not in self._derived:
+            with self._derived_lock:
+                if builder not in self._derived:
+                    self._derived[builder] = builder()
+        return self._derived[builder]
+
+
+_DATASET = None
+_DATASET_LOCK = threading.Lock()
+
+
+def _current_dataset():
+    global _DATASET
+    version = _file_version()
+    dataset = _DATASET
+    if dataset is not None and dataset.version == version:
+        return dataset
+
+    with _DATASET_LOCK:
+        # Another thread may have reloaded while we waited
+        if _DATASET is None or _DATASET.version != version:
+            _DATASET = _open_dataset(version)
+        return _DATASET
+
+
+def dataset_version():
+    """Fingerprint (path, size, mtime) of the dataset currently on disk."""
+    return _file_version()
+
+
+def load_movies(columns=None):
+    """Return the cleaned movie table, loaded once per process.
+
+    Pass ``columns`` to get a narrow frame with only those columns;
+    names missing from the dataset are skipped, so callers keep their
+    own ``in df.columns`` checks. Only requested columns are ever
+    materialized.
+
+    The frame shares its data with the cache, so callers can add or
+    replace columns without touching it. Treat the values themselves
+    as read-only.
+    """
+    return _current_dataset().frame(columns)
+
+
+def cached_per_dataset(builder):
+    """Decorator: run a zero-argument builder once per dataset version.
+
+    Use it for structures derived from the movie table (indexes,
+    lookups, aggregates) and for page layouts, so navigation reuses
+    the component tree. The result is dropped together with the
+    dataset when the data file changes.
+    """
+    @functools.wraps(builder)
+    def wrapper():
+        return _current_dataset().derived(builder)
+    return wrapper
+
+
+# Number of distinct filter selections kept in memory per worker
+SELECTION_CACHE_SIZE = 16
+
+def cached_per_selection(builder):
+    """Decorator: memoize a filter-selection builder for the dataset version.
+
+    Callbacks that share a selection (KPIs, charts, table) then filter
+    once per selection, whichever asks first. Arguments must be
+    hashable (see filters.filter_key). The SELECTION_CACHE_SIZE most
+    recent selections are kept; entries of an older dataset version are
+    never hit again and age out.
+    """
+    @functools.lru_cache(maxsize=SELECTION_CACHE_SIZE)
+    def cached(version, *args):
+        return builder(*args)
+
+    @functools.wraps(builder)
+    def wrapper(*args):
+        return cached(dataset_version(), *args)
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
 
-    return df
\ No newline at end of file
+@cached_per_dataset
+def load_company_index():
+    """Movie-to-company bridge and company lookup (see CompanyIndex)."""
+    return CompanyIndex(load_movies([COMPANY_COL]))
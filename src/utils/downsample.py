@@ -0,0 +1,56 @@
+# src/utils/downsample.py
+
+import numpy as np
+
+# Scatter plots with more points than this are thinned before plotting
+SCATTER_MAX_POINTS = 10_000
+
+# Starting grid resolution per axis, roughly one cell per 2-3 pixels
+# of a half-width chart
+GRID_CELLS = 256
+
+def _to_grid(values, n_cells, log):
+    values = values.astype("float64")
+    if log:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.log10(np.where(values > 0, values, np.nan))
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.zeros(len(values), dtype="int64")
+
+    lo, hi = values[finite].min(), values[finite].max()
+    span = hi - lo if hi > lo else 1.0
+    cells = np.floor((values - lo) / span * (n_cells - 1))
+    return np.where(finite, cells, n_cells).astype("int64")
+
+def thin_scatter(df, x, y, max_points=SCATTER_MAX_POINTS, log_x=False, log_y=False):
+    """Visually lossless thinning of a scatter frame.
+
+    Above ``max_points`` rows, the plot area is split into a grid about
+    as fine as the rendered chart's pixels and one point is kept per
+    occupied cell; the grid is coarsened only until the result fits in
+    ``max_points``. Dense clusters collapse, while isolated points (the
+    outliers) always survive, as do the rows holding the x and y
+    extremes. Row order is preserved.
+    """
+    if len(df) <= max_points:
+        return df
+
+    xs = df[x].to_numpy(dtype="float64", na_value=np.nan)
+    ys = df[y].to_numpy(dtype="float64", na_value=np.nan)
+
+    n_cells = GRID_CELLS
+    while True:
+        cell = _to_grid(xs, n_cells, log_x) * (n_cells + 1) + _to_grid(ys, n_cells, log_y)
+        _, keep = np.unique(cell, return_index=True)
+        if len(keep) <= max_points or n_cells <= 2:
+            break
+        n_cells = max(2, int(n_cells * 0.75))
+
+    extremes = [
+        pick(values)
+        for values in (xs, ys) if not np.isnan(values).all()
+        for pick in (np.nanargmin, np.nanargmax)
+    ]
+    keep = np.unique(np.concatenate([keep, extremes]).astype("int64"))
+    return df.iloc[keep]
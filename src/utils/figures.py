@@ -0,0 +1,245 @@
+# src/utils/figures.py
+
+"""Figure factory: plotly figures as plain dicts.
+
+dcc.Graph takes a figure as a dict, so callbacks do not need
+plotly express or graph_objects, whose property validation was most
+of the chart callbacks' time. Traces are written as the dicts
+plotly.js reads, with numeric columns as base64 typed arrays (the
+encoding plotly itself uses). Templates are resolved once by name.
+
+The returned dicts may be shared (see empty_figure); treat them as
+read-only.
+"""
+
+import base64
+import hashlib
+import json
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import plotly.colors
+import plotly.io as pio
+from dash import Patch, no_update
+
+from src.utils.downsample import thin_scatter
+from src.utils.theme import THEME_TEMPLATE
+from src.utils.trendline import lowess_curve
+
+# Above this many markers scatter traces render with WebGL (scattergl);
+# SVG repaint time grows steeply past a few thousand markers
+WEBGL_POINT_THRESHOLD = 1000
+
+# Largest bubble diameter in pixels (plotly express' size_max default)
+BUBBLE_SIZE_MAX = 20
+
+_INT32 = np.iinfo(np.int32)
+
+# Trace properties that carry the data; a filter change only touches these
+DATA_PROPS = frozenset({
+    "x", "y", "z", "text", "hovertext", "customdata",
+    "ids", "labels", "parents", "values",
+    "marker.color", "marker.colors", "marker.size", "marker.sizeref",
+    "q1", "median", "q3", "lowerfence", "upperfence",
+})
+
+# ---------------------------------------------------------
+# Building blocks
+# ---------------------------------------------------------
+def array(values):
+    """Trace data: numeric values as a typed array, anything else as a list."""
+    if isinstance(values, (pd.Series, pd.Index)):
+        dtype = values.dtype
+        if not pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            return values.tolist()
+        # Nullable extension dtypes (Int16, Float32, ...) hold pd.NA
+        values = values.to_numpy() if isinstance(dtype, np.dtype) else values.to_numpy("float64", na_value=np.nan)
+
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        if arr.dtype.itemsize == 8:
+            fits = arr.size == 0 or (arr.min() >= _INT32.min and arr.max() <= _INT32.max)
+            arr = arr.astype("<i4") if fits else arr.astype("<f8")
+    elif arr.dtype.kind != "f":
+        return arr.tolist()
+
+    arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<"))
+    return {"dtype": arr.dtype.str[1:], "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+
+@lru_cache(maxsize=None)
+def _template(name):
+    return pio.templates[name].to_plotly_json()
+
+@lru_cache(maxsize=None)
+def _colorscale(name):
+    return plotly.colors.get_colorscale(name)
+
+def axis(title=None, money=False, **props):
+    """Axis layout dict; ``money`` formats ticks as $1.2M."""
+    if title is not None:
+        props["title"] = {"text": title}
+    if money:
+        props.update(tickformat="~s", tickprefix="$")
+    return props
+
+def coloraxis(scale, title=None, showscale=True):
+    """Shared continuous color axis using a named plotly colorscale."""
+    out = {"colorscale": _colorscale(scale), "showscale": showscale}
+    if title is not None:
+        out["colorbar"] = {"title": {"text": title}}
+    return out
+
+def figure(data, title=None, template=THEME_TEMPLATE, **layout):
+    """Figure dict from trace dicts, with the named template resolved."""
+    layout = {"template": _template(template), **layout}
+    if title is not None:
+        layout["title"] = {"text": title}
+    return {"data": list(data), "layout": layout}
+
+@lru_cache(maxsize=None)
+def empty_figure(message="No data for the selected filters", title=None):
+    """Placeholder with ``message`` in the middle, built once per message."""
+    return figure(
+        [],
+        title=title or message,
+        template="plotly_white",
+        xaxis={"visible": False},
+        yaxis={"visible": False},
+        annotations=[{
+            "text": message,
+            "xref": "paper",
+            "yref": "paper",
+            "showarrow": False,
+            "font": {"size": 16}
+        }],
+    )
+
+# ---------------------------------------------------------
+# Scatter
+# ---------------------------------------------------------
+def scatter_figure(df, x, y, title, hover_name=None, log_x=False, trendline=None,
+                   x_title=None, y_title=None, color=None, size=None, marker_color=None,
+                   template=THEME_TEMPLATE, **layout):
+    """Money-axis scatter with thinning, WebGL switching and optional LOWESS.
+
+    ``df`` should already be free of missing x/y. Large frames are
+    thinned for plotting (see thin_scatter), but a ``"lowess"``
+    trendline is fitted on every row. ``color``/``size`` name columns
+    for a bubble chart on the layout's ``coloraxis``; otherwise points
+    use ``marker_color`` or the template's first colour.
+    """
+    plot_df = thin_scatter(df, x, y, log_x=log_x)
+    trace_type = "scattergl" if len(plot_df) > WEBGL_POINT_THRESHOLD else "scatter"
+
+    hover = f"{x}=%{{x}}<br>{y}=%{{y}}"
+    if color is not None:
+        marker = {"color": array(plot_df[color]), "coloraxis": "coloraxis"}
+        if color != y:
+            hover += f"<br>{color}=%{{marker.color}}"
+    else:
+        marker = {"color": marker_color or _template(template)["layout"]["colorway"][0]}
+    if size is not None:
+        peak = plot_df[size].max()
+        marker.update(
+            size=array(plot_df[size]),
+            sizemode="area",
+            sizeref=peak / BUBBLE_SIZE_MAX ** 2 if peak > 0 else 1,
+        )
+
+    trace = {
+        "type": trace_type,
+        "mode": "markers",
+        "x": array(plot_df[x]),
+        "y": array(plot_df[y]),
+        "marker": marker,
+        "name": "",
+        "showlegend": False,
+        "hovertemplate": hover + "<extra></extra>",
+    }
+    if hover_name is not None:
+        trace["hovertext"] = array(plot_df[hover_name])
+        trace["hovertemplate"] = "<b>%{hovertext}</b><br><br>" + trace["hovertemplate"]
+    data = [trace]
+
+    if trendline == "lowess":
+        curve_x, curve_y = lowess_curve(df[x], df[y])
+        data.append({
+            "type": trace_type,
+            "mode": "lines",
+            "x": array(curve_x),
+            "y": array(curve_y),
+            "name": "",
+            "showlegend": False,
+            "line": {"color": marker["color"]} if color is None else {},
+            "hovertemplate": (
+                "<b>LOWESS trendline</b><br><br>"
+                f"{x}=%{{x}}<br>{y}=%{{y}} <b>(trend)</b><extra></extra>"
+            ),
+        })
+
+    return figure(
+        data,
+        title=title,
+        template=template,
+        xaxis=axis(x_title or x, money=True, **({"type": "log"} if log_x else {})),
+        yaxis=axis(y_title or y, money=True),
+        **layout,
+    )
+
+# ---------------------------------------------------------
+# Partial updates
+# ---------------------------------------------------------
+def _split(props, prefix=""):
+    """Split trace properties into (data by dotted path, everything else)."""
+    data, shape = {}, {}
+    for key, value in props.items():
+        path = prefix + key
+        if path in DATA_PROPS:
+            data[path] = value
+        elif isinstance(value, dict) and "bdata" not in value:
+            sub_data, shape[key] = _split(value, path + ".")
+            data.update(sub_data)
+        else:
+            shape[key] = value
+    return data, shape
+
+def patch_figure(fig, previous=None):
+    """Figure update for a graph that currently shows figure ``previous``.
+
+    Returns ``(update, signature)``. The signature covers everything but
+    the trace data (layout, trace types and styling); keep it in a
+    dcc.Store and pass it back as ``previous`` on the next call. While
+    it is unchanged, ``update`` is a dash Patch that replaces only the
+    data arrays; otherwise it is the full figure. The template is left
+    out of the signature: it is fixed per chart.
+    """
+    traces = [_split(trace) for trace in fig["data"]]
+    shape = {
+        "layout": {k: v for k, v in fig["layout"].items() if k != "template"},
+        "data": [[sorted(data), rest] for data, rest in traces],
+    }
+    signature = hashlib.blake2b(
+        json.dumps(shape, sort_keys=True, default=str).encode(), digest_size=8
+    ).hexdigest()
+
+    if signature != previous:
+        return fig, signature
+    if not any(data for data, _ in traces):
+        return no_update, signature
+
+    patch = Patch()
+    for i, (data, _) in enumerate(traces):
+        for path, value in data.items():
+            *parents, leaf = path.split(".")
+            target = patch["data"][i]
+            for key in parents:
+                target = target[key]
+            target[leaf] = value
+    return patch, signature
+
+def patch_figures(figs, previous=None):
+    """patch_figure over several graphs; returns (updates, signatures)."""
+    previous = previous or [None] * len(figs)
+    updates, signatures = zip(*(patch_figure(fig, prev) for fig, prev in zip(figs, previous)))
+    return updates, list(signatures)
@@ -0,0 +1,48 @@
+# src/utils/filter_inputs.py
+
+"""Input policy for the filter sliders.
+
+Set with the FILTER_UPDATE_MODE environment variable:
+
+- ``release`` (default): callbacks run once, when the handle is released.
+- ``debounce``: callbacks also run during a drag, whenever the handle
+  has rested for FILTER_DEBOUNCE_MS milliseconds.
+
+Pages build their sliders with ``range_slider``, callbacks listen via
+``slider_input`` and ``register_slider_policy`` wires the browser side.
+"""
+
+import os
+
+from dash import Input, dcc, html
+
+from src.utils.clientside import register_debounce
+
+FILTER_UPDATE_MODE = os.environ.get("FILTER_UPDATE_MODE", "release")
+FILTER_DEBOUNCE_MS = int(os.environ.get("FILTER_DEBOUNCE_MS", "300"))
+
+if FILTER_UPDATE_MODE not in ("release", "debounce"):
+    raise ValueError(f"FILTER_UPDATE_MODE must be 'release' or 'debounce', not {FILTER_UPDATE_MODE!r}")
+
+def _debounced_id(slider_id):
+    return f"{slider_id}-debounced"
+
+def range_slider(id, **props):
+    """dcc.RangeSlider that follows the input policy."""
+    slider = dcc.RangeSlider(id=id, updatemode="mouseup", **props)
+    if FILTER_UPDATE_MODE == "release":
+        return slider
+    # Holds the debounced drag value; callbacks listen here instead
+    return html.Div([slider, dcc.Store(id=_debounced_id(id), data=props.get("value"))])
+
+def slider_input(slider_id):
+    """Callback Input for the value of a ``range_slider``."""
+    if FILTER_UPDATE_MODE == "release":
+        return Input(slider_id, "value")
+    return Input(_debounced_id(slider_id), "data")
+
+def register_slider_policy(app, *slider_ids):
+    """Browser-side wiring for the sliders (nothing to do on release)."""
+    if FILTER_UPDATE_MODE == "debounce":
+        for slider_id in slider_ids:
+            register_debounce(app, slider_id, "drag_value", _debounced_id(slider_id), "data", FILTER_DEBOUNCE_MS)
@@ -1,8 +1,78 @@
 # src/utils/filters.py
 
-def apply_filters(df, genres=None, year_range=None):
+import numpy as np
+import pandas as pd
+
+from src.utils.data_loader import load_movies, cached_per_dataset
+
+class FilterIndex:
+    """Row positions of the full movie table, organised for filtering.
+
+    - rows with a known Year, sorted by Year, so a year range is a
+      binary search plus a slice
+    - a genre code per row, so a genre selection is a lookup over the
+      candidate rows only
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+
+        years = df["Year"].to_numpy(dtype="float64", na_value=np.nan)
+        self.years = years
+        self.valid_positions = np.flatnonzero(~np.isnan(years))
+        order = np.argsort(years[self.valid_positions], kind="stable")
+        self.year_positions = self.valid_positions[order]
+        self.sorted_years = years[self.year_positions]
+
+        codes, genres = pd.factorize(df["Genre"])
+        self.genre_codes = codes
+        self.genre_lookup = {genre: code for code, genre in enumerate(genres)}
+        self.genre_counts = np.bincount(codes[codes >= 0], minlength=len(genres))
+
+    def select(self, genres=None, year_range=None):
+        """Sorted row positions matching the filters (rows without Year excluded)."""
+        if year_range:
+            lo = np.searchsorted(self.sorted_years, year_range[0], side="left")
+            hi = np.searchsorted(self.sorted_years, year_range[1], side="right")
+            positions = self.year_positions[lo:hi]
+        else:
+            positions = self.valid_positions
+
+        if genres:
+            codes = [self.genre_lookup[g] for g in genres if g in self.genre_lookup]
+            if not codes:
+                return positions[:0]
+
+            if self.genre_counts[codes].sum() < len(positions):
+                # Fewer genre rows than year rows: start from the genre side
+                genre_rows = np.flatnonzero(np.isin(self.genre_codes, codes))
+                years = self.years[genre_rows]
+                keep = ~np.isnan(years)
+                if year_range:
+                    keep &= (years >= year_range[0]) & (years <= year_range[1])
+                return genre_rows[keep]
+
+            positions = positions[np.isin(self.genre_codes[positions], codes)]
+
+        # Keep the original row order
+        return np.sort(positions) if year_range else positions
+
+
+def filter_key(genres=None, year_range=None):
+    """Hashable, order-independent form of a (genres, year range) selection."""
+    genres = tuple(sorted(genres)) if genres else ()
+    year_range = tuple(year_range) if year_range else ()
+    return genres, year_range
+
+
+@cached_per_dataset
+def filter_index():
+    return FilterIndex(load_movies(["Year", "Genre"]))
+
+
+def _apply_masks(df, genres=None, year_range=None):
     df = df[df["Year"].notna()]
-    
+
     if genres:
         df = df[df["Genre"].isin(genres)]
 
@@ -13,3 +83,63 @@ def apply_filters(df, genres=None, year_range=None):
         ]
 
     return df
+
+
+def apply_filters(df, genres=None, year_range=None):
+    # Frames straight from load_movies() line up with the prebuilt
+    # index; anything else (already filtered, other data) uses masks.
+    index = filter_index()
+    if not isinstance(df.index, pd.RangeIndex) or len(df) != index.n_rows:
+        return _apply_masks(df, genres, year_range)
+
+    return df.iloc[index.select(genres, year_range)]
+
+
+# ---------------------------------------------------------
+# Financial Analysis filters
+# ---------------------------------------------------------
+def _range_mask(df, col, value_range):
+    """Rows with a value in ``col``, inside ``value_range`` when given."""
+    if col not in df.columns:
+        return True
+    values = df[col].to_numpy(dtype="float64", na_value=np.nan)
+    mask = ~np.isnan(values)
+    if value_range and len(value_range) == 2:
+        mask &= (values >= value_range[0]) & (values <= value_range[1])
+    return mask
+
+
+def _roi_mask(df, roi_cat):
+    if "ROI (%)" not in df.columns or not roi_cat or roi_cat == "all":
+        return True
+    roi = df["ROI (%)"].to_numpy(dtype="float64", na_value=np.nan)
+    if roi_cat == "high":
+        return roi > 100
+    if roi_cat == "moderate":
+        return (roi >= 0) & (roi <= 100)
+    if roi_cat == "low":
+        return roi < 0
+    return ~np.isnan(roi)
+
+
+def financial_mask(df, profit_range=None, budget_range=None, roi_cat=None, genres=None):
+    """One boolean mask for the genre, profit, budget and ROI-category filters.
+
+    Rows missing Profit or Budget are always excluded, and rows missing
+    ROI are excluded whenever an ROI category is picked.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if genres:
+        mask &= df["Genre"].isin(genres).to_numpy()
+    mask &= _range_mask(df, "Profit (USD)", profit_range)
+    mask &= _range_mask(df, "Production Budget (USD)", budget_range)
+    mask &= _roi_mask(df, roi_cat)
+    return mask
+
+
+def financial_key(profit_range=None, budget_range=None, roi_cat=None, genres=None):
+    """Hashable, order-independent form of a Financial Analysis selection."""
+    profit_range = tuple(profit_range) if profit_range else ()
+    budget_range = tuple(budget_range) if budget_range else ()
+    genres = tuple(sorted(genres)) if genres else ()
+    return profit_range, budget_range, roi_cat or "all", genres
@@ -1,5 +1,7 @@
 # src/utils/formatting.py
 
+import math
+
 def format_money(x):
     try:
         x = float(x)
@@ -17,3 +19,23 @@ def money_axis(x):
     if abs(x) >= 1e6:
         return f"{x/1e6:.1f}M"
     return f"{x/1e3:.0f}K"
+
+
+def kpi_value(value, kind="money"):
+    """Raw KPI for the browser to format (see assets/clientside.js).
+
+    A page keeps its KPIs' raw values in a dcc.Store, and
+    register_kpi_formatter formats them into the cards in the browser.
+
+    ``kind`` is one of money, count, percent, minutes or text. Missing
+    values are sent as None and shown as N/A.
+    """
+    if value is None:
+        return [None, kind]
+    if kind == "text":
+        return [str(value), kind]
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return [None, kind]
+    return [None if math.isnan(value) else value, kind]
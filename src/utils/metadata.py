@@ -0,0 +1,44 @@
+# src/utils/metadata.py
+
+"""Filter domains and option lists for the page layouts.
+
+Layouts only need a handful of facts about the data (year bounds,
+genre list, studios, money ranges). They are computed once per
+dataset version instead of on every page visit.
+"""
+
+from src.utils.data_loader import load_movies, load_company_index, cached_per_dataset
+
+METADATA_COLUMNS = ["Year", "Genre", "Profit (USD)", "Production Budget (USD)"]
+
+def _int_range(df, col, default):
+    if col in df.columns and df[col].notna().any():
+        return int(df[col].min()), int(df[col].max())
+    return default
+
+def _options(values):
+    return [{"label": v, "value": v} for v in values]
+
+class DatasetMetadata:
+    """Slider bounds and dropdown options, with the pages' fallbacks."""
+
+    def __init__(self, df, studios):
+        self.year_range = _int_range(df, "Year", (2000, 2025))
+        self.profit_range = _int_range(df, "Profit (USD)", (0, 100_000_000))
+        self.budget_range = _int_range(df, "Production Budget (USD)", (0, 200_000_000))
+
+        self.genres = sorted(df["Genre"].dropna().unique()) if "Genre" in df.columns else []
+        self.genre_options = _options(self.genres)
+
+        # Individual companies from the company index (already sorted)
+        self.studios = list(studios)
+        self.studio_options = _options(self.studios)
+
+    def year_marks(self, step):
+        """Year slider marks every ``step`` years from the first year."""
+        year_min, year_max = self.year_range
+        return {y: str(y) for y in range(year_min, year_max + 1, max(1, step))}
+
+@cached_per_dataset
+def dataset_metadata():
+    return DatasetMetadata(load_movies(METADATA_COLUMNS), load_company_index().real_companies())
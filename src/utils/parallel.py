@@ -0,0 +1,48 @@
+# src/utils/parallel.py
+
+"""Opt-in concurrent figure builds within one callback.
+
+With PARALLEL_FIGURES=1, ``run_all`` runs a callback's independent
+figure builders on a shared thread pool sized to the cores this
+process may use (FIGURE_WORKERS overrides). numpy, pandas and
+statsmodels release the GIL in their heavy loops, so the builds
+overlap. Off by default: run_all then just calls the builders in order.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+def _available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+PARALLEL_FIGURES = os.environ.get("PARALLEL_FIGURES", "0") == "1"
+FIGURE_WORKERS = int(os.environ.get("FIGURE_WORKERS", _available_cores()))
+
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+
+def _pool():
+    global _POOL, _POOL_PID
+    # A forked background job inherits the object but not its threads
+    if _POOL is None or _POOL_PID != os.getpid():
+        with _POOL_LOCK:
+            if _POOL is None or _POOL_PID != os.getpid():
+                _POOL = ThreadPoolExecutor(max_workers=FIGURE_WORKERS, thread_name_prefix="figures")
+                _POOL_PID = os.getpid()
+    return _POOL
+
+def run_all(*builders):
+    """Call each zero-argument builder and return their results in order.
+
+    The builders must be independent of each other: they run
+    concurrently when PARALLEL_FIGURES is set.
+    """
+    if not PARALLEL_FIGURES or FIGURE_WORKERS < 2 or len(builders) < 2:
+        return [build() for build in builders]
+    futures = [_pool().submit(build) for build in builders]
+    return [future.result() for future in futures]
@@ -0,0 +1,59 @@
+# src/utils/request_gate.py
+
+"""Drop superseded callback requests.
+
+When a session fires a callback again (another slider release, a new
+genre), the result of its previous request will be thrown away by the
+browser. Expensive callbacks take a ticket when they start and call
+``check`` between steps. Once a newer request for the same callback
+and session has reached this worker, ``check`` raises PreventUpdate and
+the stale request stops early.
+
+Requests only see each other within one worker process, so this pays
+off with threaded workers (see Procfile).
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+
+from dash.exceptions import PreventUpdate
+
+# (session, callback) pairs remembered per worker
+GATE_MAX_ENTRIES = 4096
+
+class RequestGate:
+    """Latest request number per (session, callback name)."""
+
+    def __init__(self, max_entries=GATE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._latest = OrderedDict()
+        self._lock = threading.Lock()
+        self._numbers = itertools.count(1)
+
+    def begin(self, session_id, name):
+        """Ticket for a new request; it supersedes the session's earlier ones."""
+        if not session_id:
+            return None
+        key = (session_id, name)
+        with self._lock:
+            number = next(self._numbers)
+            self._latest[key] = number
+            self._latest.move_to_end(key)
+            while len(self._latest) > self.max_entries:
+                self._latest.popitem(last=False)
+        return key, number
+
+    def is_stale(self, ticket):
+        if ticket is None:
+            return False
+        key, number = ticket
+        with self._lock:
+            return self._latest.get(key, number) != number
+
+    def check(self, ticket):
+        """Stop the callback (PreventUpdate) if a newer request has arrived."""
+        if self.is_stale(ticket):
+            raise PreventUpdate
+
+REQUEST_GATE = RequestGate()
@@ -0,0 +1,138 @@
+# src/utils/sketch.py
+
+"""Mergeable quantile sketches over log-spaced buckets (as in DDSketch).
+
+A sketch is an array of bucket counts. Two sketches over the same
+LogBuckets merge by adding their arrays, so sketches kept per group
+(genre, year, ...) combine into the sketch of any union of groups
+without going back to the rows. Quantiles read from a sketch are
+within ``relative_accuracy`` of a value of the data.
+"""
+
+import numpy as np
+
+# Quantiles are exact to within 1% of the value
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+# Buckets per sign at most; smaller magnitudes share the lowest bucket
+SKETCH_MAX_BUCKETS = 2048
+
+class LogBuckets:
+    """Value-to-bucket mapping shared by the sketches of one measure.
+
+    Bucket ``k`` holds magnitudes in (gamma^(k-1), gamma^k], with
+    ``gamma = (1 + a) / (1 - a)``. Buckets are laid out on one axis in
+    value order: negative values, zero, positive values. The key range
+    is fixed from ``values`` at build time; values outside it land in
+    the end buckets.
+    """
+
+    def __init__(self, values, relative_accuracy=SKETCH_RELATIVE_ACCURACY, max_buckets=SKETCH_MAX_BUCKETS):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+
+        values = np.asarray(values, dtype="float64")
+        magnitudes = np.abs(values[np.isfinite(values) & (values != 0)])
+        if magnitudes.size:
+            lo, hi = self._keys(magnitudes.min()), self._keys(magnitudes.max())
+        else:
+            lo = hi = 0
+        self._min_key = max(lo, hi - max_buckets + 1)
+        self.n_keys = int(hi - self._min_key + 1)
+
+        # Position of the zero bucket; negatives below it, positives above
+        self.zero = self.n_keys
+        self.size = 2 * self.n_keys + 1
+
+    @classmethod
+    def spanning(cls, min_magnitude, max_magnitude, **kwargs):
+        """Buckets fixed up front, for sketches filled before the data is seen."""
+        return cls([min_magnitude, max_magnitude], **kwargs)
+
+    def _keys(self, magnitudes):
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype("int64")
+
+    def index(self, values):
+        """Bucket position of each value, -1 where it is missing.
+
+        Infinite values (an ROI over a zero budget) count as missing:
+        the end buckets would otherwise take them as real values.
+        """
+        values = np.asarray(values, dtype="float64")
+        out = np.full(values.shape, -1, dtype="int64")
+        known = np.isfinite(values)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            keys = self._keys(np.where(known & (values != 0), np.abs(values), 1.0))
+        keys = np.clip(keys - self._min_key, 0, self.n_keys - 1)
+
+        positive, negative = known & (values > 0), known & (values < 0)
+        out[positive] = self.zero + 1 + keys[positive]
+        out[negative] = self.zero - 1 - keys[negative]
+        out[known & (values == 0)] = self.zero
+        return out
+
+    def values(self):
+        """Representative value of each bucket, in bucket order."""
+        keys = np.arange(self.n_keys) + self._min_key
+        magnitudes = 2 * self.gamma ** keys / (self.gamma + 1)
+        return np.concatenate([-magnitudes[::-1], [0.0], magnitudes])
+
+    def sketch(self, values):
+        """Sketch (bucket counts) of ``values``; missing and infinite values are skipped."""
+        index = self.index(values)
+        return np.bincount(index[index >= 0], minlength=self.size)
+
+def sketch_quantiles(counts, buckets, qs):
+    """Quantiles ``qs`` from sketch ``counts`` (buckets on the last axis).
+
+    Ranks are interpolated linearly, like pandas' quantile and median.
+    Returns an array of shape ``counts.shape[:-1] + (len(qs),)``, NaN
+    for empty sketches.
+    """
+    counts = np.asarray(counts)
+    qs = np.atleast_1d(np.asarray(qs, dtype="float64"))
+    cum = np.cumsum(counts, axis=-1)
+    n = cum[..., -1:]
+    representative = buckets.values()
+
+    rank = qs * np.maximum(n - 1, 0)
+    below, frac = np.floor(rank), rank - np.floor(rank)
+
+    def value_at(r):
+        # First bucket whose cumulative count passes rank r
+        pos = (cum[..., None, :] > r[..., None]).argmax(axis=-1)
+        return representative[pos]
+
+    low, high = value_at(below), value_at(np.minimum(below + 1, np.maximum(n - 1, 0)))
+    out = low + (high - low) * frac
+    return np.where(n > 0, out, np.nan)
+
+def sketch_box_stats(counts, buckets, whisker=1.5):
+    """Box-plot statistics from sketch ``counts`` (buckets on the last axis).
+
+    Returns a dict of arrays ``q1``, ``median``, ``q3``, ``lowerfence``
+    and ``upperfence``. The fences are Tukey's: the most extreme values
+    within ``whisker`` IQRs of the box, read from the occupied buckets.
+    """
+    counts = np.asarray(counts)
+    q1, median, q3 = np.moveaxis(sketch_quantiles(counts, buckets, [0.25, 0.5, 0.75]), -1, 0)
+    iqr = q3 - q1
+    values = buckets.values()
+    occupied = counts > 0
+
+    inside_low = occupied & (values >= (q1 - whisker * iqr)[..., None])
+    inside_high = occupied & (values <= (q3 + whisker * iqr)[..., None])
+    last = counts.shape[-1] - 1
+    lowerfence = values[inside_low.argmax(axis=-1)]
+    upperfence = values[last - inside_high[..., ::-1].argmax(axis=-1)]
+
+    empty = ~occupied.any(axis=-1)
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        # Bucket values can fall just inside the interpolated quartiles
+        "lowerfence": np.where(empty, np.nan, np.minimum(lowerfence, q1)),
+        "upperfence": np.where(empty, np.nan, np.maximum(upperfence, q3)),
+    }
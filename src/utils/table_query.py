@@ -0,0 +1,155 @@
+# src/utils/table_query.py
+
+"""Backend paging, sorting and filtering for dash_table.DataTable.
+
+Used with ``page_action="custom"``, ``sort_action="custom"`` and
+``filter_action="custom"``: the table sends its page, ``sort_by`` and
+``filter_query`` to a callback, which returns only the visible rows.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# "{column} op value": the operator is the token after the column, with
+# an optional case prefix (i: insensitive, s: sensitive, the default)
+_FILTER_CLAUSE = re.compile(
+    r"^\s*\{(?P<name>.+?)\}\s*"
+    r"(?P<op>[is]?(?:>=|<=|!=|=|>|<|(?:contains|eq|ne|ge|le|gt|lt)(?=\s|$))|datestartswith(?=\s|$))"
+    r"\s*(?P<value>.*?)\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Symbolic operators by name
+_SYMBOLS = {">=": "ge", "<=": "le", "!=": "ne", "=": "eq", ">": "gt", "<": "lt"}
+
+def split_filter_part(filter_part):
+    """Parse one ``{column} op value`` clause into (column, op, value).
+
+    ``op`` is the operator's name (eq, contains, ...), prefixed with
+    "i" when the clause asks for case-insensitive matching. ``value`` is
+    the text with its quotes removed; numeric columns convert it.
+    """
+    match = _FILTER_CLAUSE.match(filter_part)
+    if not match or not match["value"]:
+        return None, None, None
+
+    op = match["op"].lower()
+    case = op[0] if op[0] in "is" and op != "datestartswith" else ""
+    op = op[len(case):]
+    op = _SYMBOLS.get(op, op)
+
+    value = match["value"]
+    quote = value[0]
+    if quote == value[-1] and quote in ("'", '"', "`") and len(value) > 1:
+        value = value[1:-1].replace("\\" + quote, quote)
+
+    return match["name"], ("i" + op if case == "i" else op), value
+
+def _clause_mask(series, op, value):
+    fold = op.startswith("i")
+    if fold:
+        op = op[1:]
+
+    if op in ("contains", "datestartswith") or not pd.api.types.is_numeric_dtype(series):
+        values = series.astype(str)
+        value = str(value)
+        if fold:
+            values, value = values.str.lower(), value.lower()
+        if op == "contains":
+            return values.str.contains(value, regex=False, na=False).to_numpy(dtype=bool)
+        if op == "datestartswith":
+            return values.str.startswith(value, na=False).to_numpy(dtype=bool)
+    else:
+        # Numeric columns compare as numbers
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        try:
+            value = float(value)
+        except ValueError:
+            return np.zeros(len(series), dtype=bool)
+
+    if op == "eq":
+        mask = values == value
+    elif op == "ne":
+        mask = values != value
+    elif op == "lt":
+        mask = values < value
+    elif op == "le":
+        mask = values <= value
+    elif op == "gt":
+        mask = values > value
+    elif op == "ge":
+        mask = values >= value
+    else:
+        return np.ones(len(series), dtype=bool)
+    return np.asarray(mask, dtype=bool)
+
+def query_mask(df, filter_query):
+    """Boolean mask for a DataTable ``filter_query`` (clauses joined by ``&&``)."""
+    mask = np.ones(len(df), dtype=bool)
+    if not filter_query:
+        return mask
+
+    for part in filter_query.split(" && "):
+        name, op, value = split_filter_part(part)
+        if name in df.columns:
+            mask &= _clause_mask(df[name], op, value)
+    return mask
+
+class SortIndex:
+    """Row order of the full table for each sortable column.
+
+    Sorting a selection walks the precomputed order and keeps the rows
+    that are in the selection, so no sort runs per request. Missing
+    values go last in both directions, as with pandas, and equal keys
+    keep their row order, as in the DataTable's own sort.
+    """
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self._orders = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            ordered = df[col].sort_values(kind="stable", na_position="last")
+            present = ordered.iloc[:len(ordered) - int(ordered.isna().sum())]
+            missing = ordered.index.to_numpy()[len(present):]
+
+            # Descending: by key rank, reversed, then by row position
+            rows = present.index.to_numpy()
+            rank = np.cumsum(present.ne(present.shift()).to_numpy(dtype=bool, na_value=True))
+            descending = rows[np.lexsort((rows, -rank))]
+            self._orders[col] = {
+                "asc": ordered.index.to_numpy(),
+                "desc": np.concatenate([descending, missing]),
+            }
+
+    def sort(self, positions, sort_by):
+        """Return ``positions`` ordered by the DataTable ``sort_by`` spec."""
+        if not sort_by or sort_by[0]["column_id"] not in self._orders:
+            return positions
+
+        orders = self._orders[sort_by[0]["column_id"]]
+        order = orders["desc" if sort_by[0]["direction"] == "desc" else "asc"]
+
+        member = np.zeros(self.n_rows, dtype=bool)
+        member[positions] = True
+        return order[member[order]]
+
+def page_records(df, sort_index, page_current, page_size, sort_by=None, filter_query=None, columns=None):
+    """Rows of one table page as records, plus the page count.
+
+    ``df`` is a row subset of the full table (index labels are row
+    positions). Only the requested page is converted to records.
+    """
+    columns = columns or list(df.columns)
+    positions = df.index.to_numpy()[query_mask(df, filter_query)]
+    positions = sort_index.sort(positions, sort_by)
+
+    page_size = page_size or 10
+    page_count = max(1, -(-len(positions) // page_size))
+    page_current = min(page_current or 0, page_count - 1)
+
+    page = positions[page_current * page_size:(page_current + 1) * page_size]
+    return df.loc[page, columns].to_dict("records"), page_count
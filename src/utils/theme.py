@@ -1,6 +1,7 @@
 # utils/theme.py
 
-import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
 
 # Business Blue Palette
 BLUE = "#1f77b4"
@@ -9,8 +10,10 @@ BLUE_DARK = "#0d3b66"
 
 PALETTE = ["#1f77b4", "#2a5783", "#4e79a7", "#6baed6", "#9ecae1"]
 
-COMMON_LAYOUT = dict(
-    template="plotly_white",
+# Name of the app template registered in plotly.io.templates
+THEME_TEMPLATE = "movies"
+
+_THEME_LAYOUT = dict(
     margin=dict(l=40, r=25, t=60, b=40),
     title_font=dict(size=18, color="#0d3b66", family="Arial"),
     paper_bgcolor="white",
@@ -27,3 +30,11 @@ COMMON_LAYOUT = dict(
         linecolor="#0d3b66",
     ),
 )
+
+def _register_template():
+    # plotly_white with the app styling on top
+    template = go.layout.Template(pio.templates["plotly_white"])
+    template.layout.update(_THEME_LAYOUT)
+    pio.templates[THEME_TEMPLATE] = template
+
+_register_template()
@@ -0,0 +1,82 @@
+# src/utils/trendline.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Same smoothing span plotly express uses for trendline="lowess"
+LOWESS_FRAC = 0.6666666
+
+# Up to this many points the fit is exact; above it, points closer
+# than 1% of the x range share one local regression (statsmodels'
+# ``delta``), which makes large fits roughly an order of magnitude faster.
+LOWESS_EXACT_MAX_POINTS = 1000
+
+# The fitted curve is smooth, so it is drawn through at most this many points
+TRENDLINE_MAX_POINTS = 500
+
+# Fitted curves kept in memory per worker
+TRENDLINE_CACHE_SIZE = 32
+
+_FITS = OrderedDict()
+_FITS_LOCK = threading.Lock()
+
+
+def _fingerprint(x, y, frac):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(x.tobytes())
+    digest.update(y.tobytes())
+    digest.update(repr(frac).encode())
+    return digest.hexdigest()
+
+
+def _fit_lowess(x, y, frac):
+    import statsmodels.api as sm
+
+    delta = 0.0
+    if len(x) > LOWESS_EXACT_MAX_POINTS:
+        delta = 0.01 * (x[-1] - x[0])
+    return sm.nonparametric.lowess(y, x, frac=frac, delta=delta, is_sorted=True, return_sorted=False)
+
+
+def lowess_trend(x, y, frac=LOWESS_FRAC):
+    """LOWESS fit of y on x, cached by the data it was fitted on.
+
+    Returns ``(x_sorted, y_fitted)`` with one point per non-missing
+    input, like plotly express. Identical inputs (the same filter
+    selection) reuse the earlier fit.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    keep = ~(np.isnan(x) | np.isnan(y))
+    order = np.argsort(x[keep], kind="stable")
+    x, y = x[keep][order], y[keep][order]
+
+    key = _fingerprint(x, y, frac)
+    with _FITS_LOCK:
+        if key in _FITS:
+            _FITS.move_to_end(key)
+            return x, _FITS[key]
+
+    fitted = _fit_lowess(x, y, frac) if len(x) > 1 else y.copy()
+
+    with _FITS_LOCK:
+        _FITS[key] = fitted
+        while len(_FITS) > TRENDLINE_CACHE_SIZE:
+            _FITS.popitem(last=False)
+    return x, fitted
+
+
+def lowess_curve(x, y, max_points=TRENDLINE_MAX_POINTS):
+    """LOWESS fit of y on x, reduced to evenly spaced points for drawing.
+
+    The fit uses every point (see lowess_trend); only the returned
+    curve is shortened, ends included.
+    """
+    x_sorted, fitted = lowess_trend(x, y)
+    if len(x_sorted) <= max_points:
+        return x_sorted, fitted
+    idx = np.unique(np.linspace(0, len(x_sorted) - 1, max_points).round().astype("int64"))
+    return x_sorted[idx], fitted[idx]
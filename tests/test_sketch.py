@@ -0,0 +1,51 @@
+# tests/test_sketch.py
+
+import numpy as np
+import pytest
+
+from src.utils.sketch import SKETCH_RELATIVE_ACCURACY, LogBuckets, sketch_box_stats, sketch_quantiles
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    return np.concatenate([rng.lognormal(4, 1.5, 2000), -rng.lognormal(2, 1, 300), np.zeros(50)])
+
+def test_quantiles_within_relative_accuracy(values):
+    buckets = LogBuckets(values)
+    qs = [0.05, 0.25, 0.5, 0.75, 0.95]
+    approx = sketch_quantiles(buckets.sketch(values), buckets, qs)
+    exact = np.quantile(values, qs)
+    np.testing.assert_allclose(approx, exact, rtol=2 * SKETCH_RELATIVE_ACCURACY)
+
+def test_sketches_merge_by_adding(values):
+    buckets = LogBuckets(values)
+    half = len(values) // 2
+    merged = buckets.sketch(values[:half]) + buckets.sketch(values[half:])
+    np.testing.assert_array_equal(merged, buckets.sketch(values))
+
+@pytest.mark.parametrize("bad", [np.inf, -np.inf, np.nan])
+def test_non_finite_values_are_missing(values, bad):
+    buckets = LogBuckets(values)
+    assert buckets.index([bad, 1.0, bad])[[0, 2]].tolist() == [-1, -1]
+
+    polluted = np.concatenate([values, np.full(500, bad)])
+    np.testing.assert_array_equal(buckets.sketch(polluted), buckets.sketch(values))
+    np.testing.assert_array_equal(
+        sketch_quantiles(buckets.sketch(polluted), buckets, [0.5, 0.99]),
+        sketch_quantiles(buckets.sketch(values), buckets, [0.5, 0.99]),
+    )
+
+def test_infinite_values_do_not_set_the_range():
+    buckets = LogBuckets([1.0, 100.0, np.inf, -np.inf])
+    assert buckets.n_keys == LogBuckets([1.0, 100.0]).n_keys
+
+def test_box_stats_ignore_infinite_values():
+    values = np.array([10.0, 20.0, 30.0, 40.0, 50.0, np.inf, np.inf, np.inf])
+    buckets = LogBuckets(values)
+    stats = sketch_box_stats(buckets.sketch(values), buckets)
+    assert stats["upperfence"] == pytest.approx(50.0, rel=2 * SKETCH_RELATIVE_ACCURACY)
+    assert stats["median"] == pytest.approx(30.0, rel=2 * SKETCH_RELATIVE_ACCURACY)
+
+def test_empty_sketch_is_nan():
+    buckets = LogBuckets([1.0, 10.0])
+    assert np.isnan(sketch_quantiles(buckets.sketch([np.nan, np.inf]), buckets, [0.5])).all()
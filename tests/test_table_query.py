@@ -0,0 +1,135 @@
+# tests/test_table_query.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.table_query import SortIndex, page_records, query_mask, split_filter_part
+
+@pytest.fixture
+def movies():
+    return pd.DataFrame({
+        "Movie Name": pd.Series(
+            ["Gone Girl", "Little Women", "gone baby gone", None, "Eq Street", "The Gentlemen"],
+            dtype="str",
+        ),
+        "Genre": pd.Categorical(["Drama", "Drama", "Drama", "Comedy", None, "Comedy"]),
+        "Year": [2014.0, 2019, 2007, np.nan, 2019, 2019],
+    })
+
+def _names(df, filter_query):
+    return df.loc[query_mask(df, filter_query), "Movie Name"].tolist()
+
+# ---------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------
+@pytest.mark.parametrize("part, expected", [
+    # Titles holding operator tokens ("ne ", "le ", "ge ", "eq ", "lt ", "gt ")
+    ('{Movie Name} contains "Gone Girl"', ("Movie Name", "contains", "Gone Girl")),
+    ('{Movie Name} contains "Little Women"', ("Movie Name", "contains", "Little Women")),
+    ('{Movie Name} contains "The Gentlemen"', ("Movie Name", "contains", "The Gentlemen")),
+    ('{Movie Name} contains "Eq Street"', ("Movie Name", "contains", "Eq Street")),
+    ('{Movie Name} contains "Salt Lake"', ("Movie Name", "contains", "Salt Lake")),
+    ('{Movie Name} = "Gt Ge Le"', ("Movie Name", "eq", "Gt Ge Le")),
+    # Unquoted and escaped values
+    ("{Movie Name} contains Gone", ("Movie Name", "contains", "Gone")),
+    ('{Movie Name} = "Say \\"Hi\\""', ("Movie Name", "eq", 'Say "Hi"')),
+    ("{Movie Name} = 'Gone Girl'", ("Movie Name", "eq", "Gone Girl")),
+    # Symbolic and named operators
+    ("{Year} >= 2000", ("Year", "ge", "2000")),
+    ("{Year} ge 2000", ("Year", "ge", "2000")),
+    ("{Year} < 2000", ("Year", "lt", "2000")),
+    ("{Year}<=2000", ("Year", "le", "2000")),
+    ("{Year} != 2000", ("Year", "ne", "2000")),
+    ("{Year} EQ 2000", ("Year", "eq", "2000")),
+    ("{Release Date} datestartswith 2001", ("Release Date", "datestartswith", "2001")),
+    # Case prefixes: i keeps its prefix, s is the default
+    ('{Movie Name} icontains "gone"', ("Movie Name", "icontains", "gone")),
+    ('{Movie Name} scontains "gone"', ("Movie Name", "contains", "gone")),
+    ('{Movie Name} i= "gone girl"', ("Movie Name", "ieq", "gone girl")),
+])
+def test_split_filter_part(part, expected):
+    assert split_filter_part(part) == expected
+
+@pytest.mark.parametrize("part", [
+    "{Movie Name} is blank",
+    "{Movie Name} contains",
+    "{Movie Name} containsx Gone",
+    "Movie Name contains Gone",
+])
+def test_split_filter_part_unsupported(part):
+    assert split_filter_part(part) == (None, None, None)
+
+# ---------------------------------------------------------
+# Filtering
+# ---------------------------------------------------------
+def test_title_search_with_operator_tokens(movies):
+    assert _names(movies, '{Movie Name} contains "Gone Girl"') == ["Gone Girl"]
+    assert _names(movies, '{Movie Name} contains "Little Women"') == ["Little Women"]
+    assert _names(movies, '{Movie Name} contains "Eq Street"') == ["Eq Street"]
+
+def test_contains_is_case_sensitive_by_default(movies):
+    assert _names(movies, "{Movie Name} contains Gone") == ["Gone Girl"]
+    assert _names(movies, "{Movie Name} scontains gone") == ["gone baby gone"]
+    assert _names(movies, "{Movie Name} icontains GONE") == ["Gone Girl", "gone baby gone"]
+
+def test_equality_case(movies):
+    assert _names(movies, '{Movie Name} = "gone girl"') == []
+    assert _names(movies, '{Movie Name} ieq "gone girl"') == ["Gone Girl"]
+    assert _names(movies, "{Genre} = Drama") == ["Gone Girl", "Little Women", "gone baby gone"]
+
+def test_numeric_and_missing_values(movies):
+    assert _names(movies, "{Year} >= 2014") == ["Gone Girl", "Little Women", "Eq Street", "The Gentlemen"]
+    assert _names(movies, "{Year} = 2007") == ["gone baby gone"]
+    assert _names(movies, "{Year} > soon") == []
+    # Missing titles never match a text comparison but do match "not equal"
+    assert None not in _names(movies, '{Movie Name} < "Z"')
+    assert np.isnan(movies.loc[query_mask(movies, '{Movie Name} != "Gone Girl"'), "Year"]).sum() == 1
+
+def test_clauses_combine(movies):
+    assert _names(movies, "{Year} = 2019 && {Genre} = Comedy") == ["The Gentlemen"]
+    # Clauses on unknown columns or operators are ignored
+    assert _names(movies, "{Year} = 2007 && {Budget} > 1 && {Genre} is blank") == ["gone baby gone"]
+
+# ---------------------------------------------------------
+# Sorting and paging
+# ---------------------------------------------------------
+@pytest.mark.parametrize("column", ["Movie Name", "Genre", "Year"])
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_sort_keeps_ties_in_row_order(movies, column, direction):
+    order = SortIndex(movies, list(movies.columns)).sort(
+        np.arange(len(movies)), [{"column_id": column, "direction": direction}]
+    )
+    expected = (
+        movies.assign(_row=np.arange(len(movies)))
+        .sort_values([column, "_row"], ascending=[direction == "asc", True], na_position="last")
+        .index.to_numpy()
+    )
+    np.testing.assert_array_equal(order, expected)
+
+def test_descending_ties_and_missing_last(movies):
+    order = SortIndex(movies, ["Year"]).sort(np.arange(len(movies)), [{"column_id": "Year", "direction": "desc"}])
+    np.testing.assert_array_equal(order, [1, 4, 5, 0, 2, 3])
+
+def test_sort_selection_and_unknown_column(movies):
+    index = SortIndex(movies, ["Year"])
+    selection = np.array([5, 0, 2])
+    np.testing.assert_array_equal(index.sort(selection, [{"column_id": "Year", "direction": "asc"}]), [2, 0, 5])
+    np.testing.assert_array_equal(index.sort(selection, [{"column_id": "Genre", "direction": "asc"}]), selection)
+    np.testing.assert_array_equal(index.sort(selection, []), selection)
+
+def test_page_records(movies):
+    index = SortIndex(movies, list(movies.columns))
+    sort_by = [{"column_id": "Year", "direction": "desc"}]
+
+    records, page_count = page_records(movies, index, 0, 2, sort_by, "{Year} >= 2007", ["Movie Name", "Year"])
+    assert page_count == 3
+    assert records == [{"Movie Name": "Little Women", "Year": 2019.0}, {"Movie Name": "Eq Street", "Year": 2019.0}]
+
+    # Past the last page: the last page
+    records, _ = page_records(movies, index, 7, 2, sort_by, "{Year} >= 2007", ["Movie Name"])
+    assert records == [{"Movie Name": "gone baby gone"}]
+
+    # A row subset of the table, filtered to nothing
+    subset = movies.iloc[[0, 2]]
+    assert page_records(subset, index, 0, 10, None, '{Movie Name} contains "Women"') == ([], 1)
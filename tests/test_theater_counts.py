@@ -0,0 +1,81 @@
+# tests/test_theater_counts.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.preprocessing.clean_data_types import parse_theater_counts
+
+COLUMNS = ["Opening Theaters", "Max Theaters"]
+
+def _parse_one(text):
+    row = parse_theater_counts(pd.Series([text], dtype=object)).iloc[0]
+    return tuple(row[COLUMNS])
+
+@pytest.mark.parametrize("text, expected", [
+    # The export's format
+    ("3,094 opening theaters/3,182 max. theaters, 5.1 weeks average run per theater", (3094, 3182)),
+    ("5 opening theaters/131 max. theaters", (5, 131)),
+    ("1,234,567 opening theaters/2,345,678 max. theaters", (1234567, 2345678)),
+    # Any case
+    ("12 Opening Theaters/40 Max. Theaters", (12, 40)),
+    ("12 OPENING THEATERS/40 MAX. THEATERS", (12, 40)),
+    # Singular "theater"
+    ("1 opening theater/1 max. theater", (1, 1)),
+    ("1 Opening Theater/3 max. theaters", (1, 3)),
+    # "max" without the period
+    ("12 opening theaters/40 max theaters", (12, 40)),
+    # Loose spacing
+    ("  12   opening  theaters / 40  max.  theaters", (12, 40)),
+    ("12 opening theaters /40 max. theaters", (12, 40)),
+    # Text after the counts
+    ("12 opening theaters/40 max. theaters; wide release", (12, 40)),
+])
+def test_parses_counts(text, expected):
+    assert _parse_one(text) == expected
+
+@pytest.mark.parametrize("text", [
+    # "theaters" has to end there (the trailing \b)
+    "12 opening theaters/40 max. theatersX",
+    "12 opening theatres/40 max. theatres",
+    # Only anchored at the start
+    "about 12 opening theaters/40 max. theaters",
+    # Both counts needed
+    "12 opening theaters",
+    "opening theaters/40 max. theaters",
+    ",12 opening theaters/40 max. theaters",
+    "12 opening theaters/40 theaters",
+    "n/a",
+    "",
+])
+def test_no_match_is_missing(text):
+    opening, maximum = _parse_one(text)
+    assert np.isnan(opening) and np.isnan(maximum)
+
+@pytest.mark.parametrize("dtype", [object, "str"])
+def test_missing_values_and_index(dtype):
+    series = pd.Series(
+        ["7 opening theaters/9 max. theaters", None, "n/a", "1 opening theater/2 max theaters"],
+        index=[10, 20, 30, 40],
+        dtype=dtype,
+    )
+    out = parse_theater_counts(series)
+
+    assert list(out.columns) == COLUMNS
+    assert out.index.equals(series.index)
+    assert (out.dtypes == "float64").all()
+    expected = pd.DataFrame(
+        {"Opening Theaters": [7, np.nan, np.nan, 1], "Max Theaters": [9, np.nan, np.nan, 2]},
+        index=series.index,
+        dtype="float64",
+    )
+    pd.testing.assert_frame_equal(out, expected)
+
+def test_non_string_values_are_missing():
+    series = pd.Series([12, 3.5, np.nan, pd.NA], dtype=object)
+    assert parse_theater_counts(series).isna().all().all()
+
+def test_all_missing_and_empty():
+    assert parse_theater_counts(pd.Series([None, np.nan], dtype=object)).isna().all().all()
+    out = parse_theater_counts(pd.Series([], dtype=object))
+    assert out.empty and list(out.columns) == COLUMNS